@@ -15,7 +15,6 @@ Genesis AI 应用 REST API 主入口
 """
 
 import logging
-import logging.config
 import yaml
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -26,8 +25,8 @@ from datetime import datetime
 
 # from src.genesis.core.simple_container_fixed import container
 from src.genesis.core.settings import settings
-from src.genesis.core.middleware import RequestIdMiddleware, TimingMiddleware
-from src.genesis.infrastructure.database.manager import get_db_session
+from src.genesis.core.logging_config import configure_logging, shutdown_logging
+from src.genesis.core.middleware import RequestContextMiddleware
 from fastapi import Response
 from apps.rest_api.v1.routers._debug_router_fixed import router as debug_router
 from apps.rest_api.v1.routers.llm_router import router as llm_router
@@ -48,7 +47,8 @@ def setup_logging():
         if config_path.exists():
             with open(config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
-            logging.config.dictConfig(config)
+            # 处理器在后台 QueueListener 线程中格式化和写入，请求路径上只入队
+            configure_logging(config)
             print("日志配置加载成功")
         else:
             print("日志配置文件不存在，使用默认配置")
@@ -105,9 +105,17 @@ async def lifespan(app: FastAPI):
     try:
         if hasattr(app.state, 'db_manager'):
             await app.state.db_manager.close()
+        from src.genesis.infrastructure.llm.http_client import close_shared_client
+        from src.genesis.infrastructure.llm.qwen_service import get_qwen_service
+        await close_shared_client()
+        # 千问服务的 AsyncOpenAI 持有刚关闭的共享客户端，丢弃缓存的实例，下次使用时重新创建
+        get_qwen_service.cache_clear()
         logger.info("应用已安全关闭")
     except Exception as e:
         logger.error(f"关闭应用时出错: {e}")
+    
+    # 停止日志队列监听器，写出队列中剩余的日志
+    shutdown_logging()
 
 # 创建 FastAPI 应用实例
 app = FastAPI(
@@ -124,30 +132,7 @@ app = FastAPI(
 )
 
 # 添加中间件 (顺序很重要)
-app.add_middleware(RequestIdMiddleware)  # 最外层，生成请求ID
-app.add_middleware(TimingMiddleware)     # 性能监控
-
-# 数据库会话清理中间件
-@app.middleware("http")
-async def db_session_cleanup_middleware(request: Request, call_next):
-    """数据库会话清理中间件"""
-    response = await call_next(request)
-    
-    # 清理数据库会话
-    if hasattr(get_db_session, '_session_contexts'):
-        # 获取当前请求的所有会话上下文
-        sessions_to_close = list(get_db_session._session_contexts.items())
-        
-        # 清理所有会话
-        for session_id, session_context in sessions_to_close:
-            try:
-                await session_context.__aexit__(None, None, None)
-                del get_db_session._session_contexts[session_id]
-            except Exception as e:
-                # 忽略清理时的错误
-                pass
-    
-    return response
+app.add_middleware(RequestContextMiddleware)  # 生成请求ID并统计耗时
 
 # 包含路由器 - 使用标准API路径格式
 app.include_router(debug_router, prefix="/api/v1")
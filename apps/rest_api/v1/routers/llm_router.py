@@ -15,11 +15,11 @@ import logging
 import json
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.genesis.infrastructure.llm.qwen_service import qwen_llm_service
+from src.genesis.infrastructure.llm.qwen_service import get_qwen_service
 from src.genesis.ai_tools.registry import tool_registry
 from src.genesis.core.settings import settings
-from src.genesis.infrastructure.database.session_service import session_service
-from src.genesis.infrastructure.database.manager import get_db_session
+from src.genesis.infrastructure.database.session_service import get_session_service
+from src.genesis.infrastructure.database.manager import get_db_session, get_readonly_db_session
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -77,7 +77,7 @@ async def format_messages_with_memory(
     # 从数据库获取历史消息
     if db:
         try:
-            history_messages = await session_service.get_history(session_id, db)
+            history_messages = await get_session_service().get_history(session_id, db)
             logger.debug("从数据库获取到 %d 条历史消息", len(history_messages))
             
             # 安全验证：确保工具调用链的完整性
@@ -212,7 +212,7 @@ async def format_messages_with_memory(
 async def save_to_memory(session_id: str, messages: List[Dict[str, Any]], db):
     """保存消息到数据库"""
     try:
-        await session_service.update_history(session_id, messages, db)
+        await get_session_service().update_history(session_id, messages, db)
         logger.debug("成功保存 %d 条消息到数据库", len(messages))
     except Exception as e:
         logger.error("保存消息到数据库失败: %s", str(e))
@@ -285,9 +285,10 @@ async def llm_with_tools(
             elif msg.get('role') == 'tool':
                 logger.debug(f"    tool_call_id: {msg.get('tool_call_id')}, name: {msg.get('name')}")
         
-        model_decision = await qwen_llm_service.get_model_decision(
+        model_decision = await get_qwen_service().get_model_decision(
             messages=messages,
-            tool_schemas=tool_schemas
+            tool_schemas=tool_schemas,
+            tools_json=tool_registry.get_all_schemas_json()
         )
         
         if not model_decision:
@@ -429,7 +430,7 @@ async def _handle_tool_calls(
         elif msg.get('role') == 'tool':
             logger.debug(f"    tool_call_id: {msg.get('tool_call_id')}, name: {msg.get('name')}")
     
-    final_answer = await qwen_llm_service.get_summary_from_tool_results(messages_for_summary)
+    final_answer = await get_qwen_service().get_summary_from_tool_results(messages_for_summary)
     
     messages_to_save = [
         current_user_message,
@@ -507,7 +508,7 @@ async def execute_tool(tool_call, session_id: str):
 async def get_session_history(
     session_id: str,
     http_request: Request,
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_readonly_db_session)
 ):
     """
     获取会话历史记录
@@ -515,7 +516,7 @@ async def get_session_history(
     request_id = getattr(http_request.state, 'request_id', 'unknown')
     
     try:
-        messages = await session_service.get_history(session_id, db)
+        messages = await get_session_service().get_history(session_id, db)
         
         logger.info(
             f"获取会话历史: {session_id}",
@@ -547,7 +548,7 @@ async def clear_session_history(
     """
     request_id = getattr(http_request.state, 'request_id', 'unknown')
     
-    success = await session_service.clear_session(session_id, db)
+    success = await get_session_service().clear_session(session_id, db)
     if success:
         logger.info(
             f"清除会话历史: {session_id}",
@@ -564,14 +565,14 @@ async def clear_session_history(
 @router.get("/llm-sessions")
 async def list_sessions(
     http_request: Request,
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_readonly_db_session)
 ):
     """
     列出所有会话
     """
     request_id = getattr(http_request.state, 'request_id', 'unknown')
     
-    sessions = await session_service.list_sessions(db)
+    sessions = await get_session_service().list_sessions(db)
     
     logger.info(
         f"列出会话: {len(sessions)} 个会话",
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+将 config/*.yaml 导出为同名 JSON 文件
+
+构建/部署时运行一次，应用启动时会优先通过 orjson 加载 JSON，
+跳过 YAML 解析。修改 YAML 后需重新导出（过期的 JSON 会被自动忽略）。
+"""
+import sys
+from pathlib import Path
+
+import orjson
+import yaml
+
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
+config_dir = Path(__file__).parent.parent / "config"
+
+
+def export_config_json() -> int:
+    """导出全部 YAML 配置，返回导出的文件数"""
+    count = 0
+    for yaml_path in sorted(config_dir.glob("*.yaml")):
+        with open(yaml_path, "r", encoding="utf-8") as f:
+            data = yaml.load(f, Loader=YAMLLoader) or {}
+        json_path = yaml_path.with_suffix(".json")
+        json_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        print(f"已导出: {yaml_path.name} -> {json_path.name}")
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    sys.exit(0 if export_config_json() else 1)
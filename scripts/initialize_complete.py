@@ -15,6 +15,7 @@ Genesis数据库完整初始化脚本
 """
 
 import asyncio
+import logging
 import sys
 from pathlib import Path
 
@@ -22,66 +23,111 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from sqlalchemy import text
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
 from src.genesis.infrastructure.database.manager import Base, DatabaseManager
 from src.genesis.infrastructure.database.models import *
+from src.genesis.infrastructure.database.models import is_deferred_index
 from src.genesis.core.settings import settings
 
 
+class _BufferedStreamHandler(logging.StreamHandler):
+    """不在每条记录后刷新流的 StreamHandler，由脚本结束时统一 flush"""
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+# 初始化进度写入带缓冲的 stdout，避免每行输出都触发一次写入系统调用；
+# 直接重新配置 sys.stdout，print 和其他日志输出与本脚本共用同一个缓冲区，顺序不会错乱
+sys.stdout.reconfigure(line_buffering=False, write_through=False)
+_handler = _BufferedStreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(message)s"))
+
+log = logging.getLogger("init")
+log.addHandler(_handler)
+log.setLevel(logging.INFO)
+log.propagate = False
+
+
 async def initialize_complete_database():
     """完整初始化数据库"""
-    print("开始完整数据库初始化...")
+    log.info("开始完整数据库初始化...")
     
     try:
         # 创建数据库管理器
         db_manager = DatabaseManager(settings.database)
         await db_manager.initialize()
-        print("OK - 数据库连接成功")
+        log.info("OK - 数据库连接成功")
         
         engine = db_manager.engine
         
         # 步骤1：从ORM模型创建所有表
-        print("\n步骤1：从ORM模型创建表...")
+        log.info("\n步骤1：从ORM模型创建表...")
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        print("OK - ORM模型表创建完成")
+            await conn.run_sync(_create_tables)
+        log.info("OK - ORM模型表创建完成")
         
-        # 步骤2：检查和创建额外的表和索引
-        print("\n步骤2：检查和创建额外的表结构...")
+        # 步骤2：检查和创建额外的表结构
+        log.info("\n步骤2：检查和创建额外的表结构...")
         await create_additional_tables(engine)
-        print("OK - 额外表结构创建完成")
+        log.info("OK - 额外表结构创建完成")
         
         # 步骤3：插入默认配置
-        print("\n步骤3：插入默认配置...")
+        log.info("\n步骤3：插入默认配置...")
         await insert_default_config(engine)
-        print("OK - 默认配置插入完成")
+        log.info("OK - 默认配置插入完成")
         
-        # 步骤4：验证所有表
-        print("\n步骤4：验证所有表...")
+        # 步骤4：创建优化索引（在数据写入之后创建，避免写入时维护索引）
+        log.info("\n步骤4：创建优化索引...")
+        await create_optimization_indexes(engine)
+        log.info("OK - 优化索引创建完成")
+        
+        # 步骤5：验证所有表
+        log.info("\n步骤5：验证所有表...")
         await verify_all_tables(engine)
-        print("OK - 所有表验证完成")
+        log.info("OK - 所有表验证完成")
         
-        # 步骤5：显示初始化结果
-        print("\n步骤5：显示初始化结果...")
+        # 步骤6：显示初始化结果
+        log.info("\n步骤6：显示初始化结果...")
         await show_initialization_summary(engine)
         
         await db_manager.close()
         
-        print("\nOK - 数据库初始化完成！")
-        print("\n新开发人员现在可以：")
-        print("1. 运行 'python run.py --auto-init' 启动应用")
-        print("2. 运行 'make run' 启动开发服务器")
-        print("3. 访问 'http://localhost:8002/docs' 查看API文档")
+        log.info(
+            "\nOK - 数据库初始化完成！\n"
+            "\n新开发人员现在可以：\n"
+            "1. 运行 'python run.py --auto-init' 启动应用\n"
+            "2. 运行 'make run' 启动开发服务器\n"
+            "3. 访问 'http://localhost:8002/docs' 查看API文档"
+        )
         
         return True
         
     except Exception as e:
-        print(f"ERROR - 数据库初始化失败: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("ERROR - 数据库初始化失败: %s", e)
         return False
 
 
+def _create_tables(sync_conn):
+    """
+    创建 ORM 模型中的表及其普通索引（唯一索引等，写入默认配置时需要）。
+
+    与 Base.metadata.create_all 相同，只是跳过 deferred_index 声明的查询优化索引，
+    这些索引由 create_optimization_indexes 在数据写入之后创建。
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            sync_conn.execute(CreateTable(table))
+        for index in table.indexes:
+            if not is_deferred_index(index):
+                sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def create_additional_tables(engine):
     """创建额外的表结构"""
     async with engine.begin() as conn:
@@ -120,16 +166,33 @@ async def create_additional_tables(engine):
         
         # 创建视图
         await create_views(conn)
-        
-        # 创建优化索引
-        await create_optimization_indexes(conn)
+
+
+# 统计物化视图及其唯一索引（REFRESH ... CONCURRENTLY 需要唯一索引）
+STATS_VIEWS = {
+    "session_stats": ("session_id",),
+    "llm_stats": ("provider", "model"),
+    "api_stats": ("method", "status_code"),
+}
+
+# 物化视图刷新间隔（cron 表达式）
+STATS_REFRESH_SCHEDULE = "*/5 * * * *"
 
 
 async def create_views(conn):
-    """创建数据库视图"""
+    """创建数据库统计物化视图"""
+    # 旧版本以普通视图创建，先删除以便重建为物化视图
+    for view_name in STATS_VIEWS:
+        result = await conn.execute(text("""
+            SELECT 1 FROM pg_views
+            WHERE schemaname = 'public' AND viewname = :view_name
+        """), {"view_name": view_name})
+        if result.fetchone():
+            await conn.execute(text(f"DROP VIEW {view_name}"))
+
     # 会话统计视图
     await conn.execute(text("""
-        CREATE OR REPLACE VIEW session_stats AS
+        CREATE MATERIALIZED VIEW IF NOT EXISTS session_stats AS
         SELECT 
             cs.session_id,
             cs.created_at as session_created_at,
@@ -144,7 +207,7 @@ async def create_views(conn):
     
     # LLM调用统计视图
     await conn.execute(text("""
-        CREATE OR REPLACE VIEW llm_stats AS
+        CREATE MATERIALIZED VIEW IF NOT EXISTS llm_stats AS
         SELECT 
             provider,
             model,
@@ -162,7 +225,7 @@ async def create_views(conn):
     
     # API请求统计视图
     await conn.execute(text("""
-        CREATE OR REPLACE VIEW api_stats AS
+        CREATE MATERIALIZED VIEW IF NOT EXISTS api_stats AS
         SELECT 
             method,
             status_code,
@@ -175,22 +238,57 @@ async def create_views(conn):
         GROUP BY method, status_code
     """))
 
+    # 为每个物化视图创建唯一索引，支持并发刷新
+    for view_name, key_columns in STATS_VIEWS.items():
+        await conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{view_name}_key "
+            f"ON {view_name}({', '.join(key_columns)})"
+        ))
 
-async def create_optimization_indexes(conn):
-    """创建优化索引"""
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_chat_messages_session_created ON chat_messages(session_id, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_llm_calls_session_created ON llm_calls(session_id, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_api_logs_created ON api_logs(created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_performance_metrics_name_timestamp ON performance_metrics(metric_name, timestamp DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_error_logs_type_created ON error_logs(error_type, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_user_behaviors_session_created ON user_behaviors(session_id, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_intent_analyses_session_created ON intent_analyses(session_id, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_ad_recommendations_session_created ON ad_recommendations(session_id, created_at DESC)",
-    ]
-    
-    for index_sql in indexes:
-        await conn.execute(text(index_sql))
+    await schedule_stats_refresh(conn)
+
+
+async def schedule_stats_refresh(conn):
+    """通过 pg_cron 定期并发刷新统计物化视图"""
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_extension WHERE extname = 'pg_cron'"
+    ))
+    if not result.fetchone():
+        lines = ["WARNING - 未安装 pg_cron 扩展，统计物化视图需要手动刷新："]
+        for view_name in STATS_VIEWS:
+            lines.append(f"  REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name};")
+        log.warning("\n".join(lines))
+        return
+
+    for view_name in STATS_VIEWS:
+        await conn.execute(text("SELECT cron.schedule(:job_name, :schedule, :command)"), {
+            "job_name": f"refresh_{view_name}",
+            "schedule": STATS_REFRESH_SCHEDULE,
+            "command": f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}",
+        })
+
+
+async def create_optimization_indexes(engine):
+    """
+    创建优化索引
+
+    索引应在批量写入数据之后创建。后续新增的大批量数据导入步骤应遵循同样的模式：
+    记录索引 DDL，DROP INDEX，使用 COPY 导入数据，再用 CREATE INDEX CONCURRENTLY 重建索引。
+    """
+    async with engine.begin() as conn:
+        # 索引定义只在 models.py 中维护（deferred_index）
+        await conn.run_sync(_create_deferred_indexes)
+
+        # api_logs 的纯时间范围访问已由 BRIN 索引覆盖
+        await conn.execute(text("DROP INDEX IF EXISTS idx_api_logs_created"))
+
+
+def _create_deferred_indexes(sync_conn):
+    """创建 ORM 模型中所有 deferred_index 声明的索引"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if is_deferred_index(index):
+                sync_conn.execute(CreateIndex(index, if_not_exists=True))
 
 
 async def insert_default_config(engine):
@@ -236,14 +334,14 @@ async def verify_all_tables(engine):
         
         missing_tables = expected_tables - existing_tables
         if missing_tables:
-            print(f"ERROR - 缺少表: {missing_tables}")
+            log.error("ERROR - 缺少表: %s", missing_tables)
             return False
         
         extra_tables = existing_tables - expected_tables
         if extra_tables:
-            print(f"WARNING - 额外表: {extra_tables}")
+            log.warning("WARNING - 额外表: %s", extra_tables)
         
-        print(f"OK - 所有必需表都存在 ({len(expected_tables)}/{len(existing_tables)})")
+        log.info("OK - 所有必需表都存在 (%d/%d)", len(expected_tables), len(existing_tables))
         return True
 
 
@@ -256,11 +354,11 @@ async def show_initialization_summary(engine):
             'llm_calls', 'api_logs', 'tool_calls'
         ]
         
-        print("\nINFO - 表记录统计:")
+        lines = ["\nINFO - 表记录统计:"]
         for table in tables_to_count:
             result = await conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
             count = result.scalar()
-            print(f"  - {table}: {count} 条记录")
+            lines.append(f"  - {table}: {count} 条记录")
         
         # 显示系统配置
         result = await conn.execute(text("""
@@ -270,12 +368,17 @@ async def show_initialization_summary(engine):
             ORDER BY key
         """))
         
-        print("\nINFO - 系统配置:")
+        lines.append("\nINFO - 系统配置:")
         for row in result.fetchall():
             key, value, description = row
-            print(f"  - {key}: {value} ({description})")
+            lines.append(f"  - {key}: {value} ({description})")
+        
+        log.info("\n".join(lines))
 
 
 if __name__ == "__main__":
-    success = asyncio.run(initialize_complete_database())
+    try:
+        success = asyncio.run(initialize_complete_database())
+    finally:
+        sys.stdout.flush()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,13 @@
+-- 聊天消息历史查询索引
+-- =====================
+--
+-- SessionService.get_history 的查询为：
+--   WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT N
+-- 建立与之完全匹配的复合索引，使其成为一次索引范围扫描，不再需要排序；
+-- 原 (session_id, created_at DESC) 索引被新索引覆盖，一并删除。
+-- CONCURRENTLY 不能在事务块中执行，请直接用 psql 运行本脚本。
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_messages_session_created
+    ON chat_messages (session_id, created_at DESC, id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_chat_messages_session_created;
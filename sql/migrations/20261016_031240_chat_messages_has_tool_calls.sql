@@ -0,0 +1,16 @@
+-- 聊天消息 has_tool_calls 列
+-- ==========================
+--
+-- SessionService.get_history 判断工具调用链时只读 role 和 has_tool_calls 列，
+-- 不再解析 content 中的 JSON。新消息由 update_history 在写入时填充该列。
+--
+-- 回填已有数据：tool_calls 只会以未转义的 JSON 键 "tool_calls" 出现在 content 中，
+-- 字符串内容里的引号会被转义为 \"，因此按子串匹配即可。
+
+ALTER TABLE chat_messages
+    ADD COLUMN IF NOT EXISTS has_tool_calls BOOLEAN NOT NULL DEFAULT FALSE;
+
+UPDATE chat_messages
+SET has_tool_calls = TRUE
+WHERE role = 'assistant'
+  AND content::text LIKE '%"tool_calls"%';
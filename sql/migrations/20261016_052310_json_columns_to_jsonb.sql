@@ -0,0 +1,42 @@
+-- JSON 列改为 JSONB
+-- ================
+--
+-- 与 models.py 保持一致：所有原先的 JSON 列改为 JSONB 存储（二进制格式，
+-- 读取时无需重新解析，并支持 GIN 索引和 @> 包含查询）。
+--
+-- 修改列类型会重写整张表并持有 ACCESS EXCLUSIVE 锁，请在维护窗口执行。
+-- 同一张表的多列放在一条 ALTER TABLE 中，每张表只重写一次。
+
+ALTER TABLE user_sessions
+    ALTER COLUMN preferences TYPE JSONB USING preferences::jsonb;
+
+ALTER TABLE user_behaviors
+    ALTER COLUMN behavior_data TYPE JSONB USING behavior_data::jsonb;
+
+ALTER TABLE intent_analyses
+    ALTER COLUMN secondary_intents TYPE JSONB USING secondary_intents::jsonb;
+
+ALTER TABLE llm_calls
+    ALTER COLUMN request_data TYPE JSONB USING request_data::jsonb,
+    ALTER COLUMN response_data TYPE JSONB USING response_data::jsonb;
+
+ALTER TABLE api_logs
+    ALTER COLUMN query_params TYPE JSONB USING query_params::jsonb,
+    ALTER COLUMN headers TYPE JSONB USING headers::jsonb;
+
+ALTER TABLE tool_calls
+    ALTER COLUMN tool_args TYPE JSONB USING tool_args::jsonb,
+    ALTER COLUMN result TYPE JSONB USING result::jsonb;
+
+ALTER TABLE performance_metrics
+    ALTER COLUMN tags TYPE JSONB USING tags::jsonb;
+
+ALTER TABLE error_logs
+    ALTER COLUMN context TYPE JSONB USING context::jsonb;
+
+ALTER TABLE audit_logs
+    ALTER COLUMN changes TYPE JSONB USING changes::jsonb;
+
+-- 按请求头做包含查询（headers @> '{...}'）的 GIN 索引，依赖上面的 JSONB 类型
+CREATE INDEX IF NOT EXISTS ix_api_logs_headers_gin
+    ON api_logs USING GIN (headers jsonb_path_ops);
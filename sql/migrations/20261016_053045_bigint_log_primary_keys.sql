@@ -0,0 +1,36 @@
+-- 高写入量表主键改为 BIGINT
+-- ========================
+--
+-- 与 models.py 保持一致：user_behaviors、llm_calls、api_logs、performance_metrics、
+-- error_logs、audit_logs 的 id 改为 BIGINT，避免 INTEGER 主键溢出；
+-- 主键序列同时改为 BIGINT 并设置 CACHE 1000，每个会话预取 1000 个值，
+-- 批量写入时不必每行都访问一次序列。
+--
+-- 已有数据库中的 id 列仍由原有序列（SERIAL 或 IDENTITY）生成，
+-- pg_get_serial_sequence 对两种方式都能找到对应序列。
+-- 修改列类型会重写整张表并持有 ACCESS EXCLUSIVE 锁，请在维护窗口执行。
+
+ALTER TABLE user_behaviors ALTER COLUMN id TYPE BIGINT;
+ALTER TABLE llm_calls ALTER COLUMN id TYPE BIGINT;
+ALTER TABLE api_logs ALTER COLUMN id TYPE BIGINT;
+ALTER TABLE performance_metrics ALTER COLUMN id TYPE BIGINT;
+ALTER TABLE error_logs ALTER COLUMN id TYPE BIGINT;
+ALTER TABLE audit_logs ALTER COLUMN id TYPE BIGINT;
+
+DO $$
+DECLARE
+    table_name TEXT;
+    seq_name TEXT;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY[
+        'user_behaviors', 'llm_calls', 'api_logs',
+        'performance_metrics', 'error_logs', 'audit_logs'
+    ]
+    LOOP
+        seq_name := pg_get_serial_sequence(table_name, 'id');
+        IF seq_name IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s AS BIGINT CACHE 1000', seq_name);
+        END IF;
+    END LOOP;
+END
+$$;
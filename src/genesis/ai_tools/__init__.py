@@ -2,10 +2,10 @@
 AI工具模块
 ==========
 
-本模块自动注册所有可用的AI工具。
+本模块负责批量注册所有可用的AI工具。
 """
 
-# 导入所有工具，这样它们就会被自动注册
+# 导入所有工具模块：其中 @tool 标记的函数在下方通过 register_pending 一次性注册
 from .tools.math_tools import calculate
 from .general_tools import (
     get_current_datetime,
@@ -18,6 +18,8 @@ from .general_tools import (
 # 导出工具注册中心和装饰器
 from .registry import tool_registry, tool
 
+tool_registry.register_pending()
+
 __all__ = [
     "tool_registry", 
     "tool", 
@@ -8,14 +8,30 @@ Genesis AI 应用通用工具包
 
 import logging
 from datetime import datetime
-import json
 import math
+import platform
+import sys
+import time
 from typing import Any
 
+import orjson
+
 from src.genesis.ai_tools.registry import tool
 
 logger = logging.getLogger(__name__)
 
+# 进程生命周期内不会变化的系统信息，在模块加载时计算一次
+_STATIC_SYS_INFO = {
+    "系统": platform.system(),
+    "系统版本": platform.version(),
+    "机器架构": platform.machine(),
+    "Python版本": sys.version,
+}
+
+# get_current_datetime 的秒级缓存：同一秒内的多次调用直接复用格式化结果
+_LAST_SEC: int = -1
+_LAST_STR: str = ""
+
 
 @tool
 async def get_current_datetime() -> str:
@@ -26,9 +42,15 @@ async def get_current_datetime() -> str:
 
     :return: 格式为 'YYYY-MM-DD HH:MM:SS' 的日期时间字符串。
     """
+    global _LAST_SEC, _LAST_STR
+
     logger.info("正在执行工具 [get_current_datetime]。")
 
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    sec = int(time.time())
+    if sec != _LAST_SEC:
+        _LAST_STR = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+        _LAST_SEC = sec
+    current_time = _LAST_STR
 
     logger.info("工具 [get_current_datetime] 执行成功，返回: %s", current_time)
 
@@ -111,18 +133,9 @@ async def get_system_info() -> str:
     logger.info("正在执行工具 [get_system_info]。")
     
     try:
-        import platform
-        import sys
-        
-        system_info = {
-            "系统": platform.system(),
-            "系统版本": platform.version(),
-            "机器架构": platform.machine(),
-            "Python版本": sys.version,
-            "当前时间": datetime.now().isoformat(),
-        }
+        system_info = {**_STATIC_SYS_INFO, "当前时间": datetime.now().isoformat()}
         
-        result = json.dumps(system_info, ensure_ascii=False, indent=2)
+        result = orjson.dumps(system_info, option=orjson.OPT_INDENT_2).decode()
         logger.info("工具 [get_system_info] 执行成功。")
         return result
         
@@ -154,7 +167,7 @@ async def search_web(query: str, num_results: int = 5) -> str:
             for i in range(min(num_results, 10))
         ]
         
-        result = json.dumps(mock_results, ensure_ascii=False, indent=2)
+        result = orjson.dumps(mock_results, option=orjson.OPT_INDENT_2).decode()
         logger.info("工具 [search_web] 执行成功，返回 %d 个结果。", len(mock_results))
         return result
         
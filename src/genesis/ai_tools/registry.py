@@ -1,7 +1,8 @@
 import inspect
-import json
 import logging
-from typing import Callable, Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, List, Optional
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,10 @@ class ToolRegistry:
         """工具注册中心构造函数"""
         self.tools: Dict[str, Callable] = {}
         self.tool_schemas: List[Dict[str, Any]] = []
+        # 被 @tool 标记、尚未注册的工具，按导入顺序排列
+        self._pending_tools: List[Callable] = []
+        # get_all_schemas_json 缓存的序列化结果，注册新工具时失效
+        self._schemas_json: Optional[bytes] = None
         logger.info("工具注册中心 (ToolRegistry) 已初始化。")
 
     def register(self, func: Callable):
@@ -24,8 +29,49 @@ class ToolRegistry:
         logger.info("开始注册新工具：%s", tool_name)
 
         self.tools[tool_name] = func
+        self.tool_schemas.append(self._build_schema(func))
+        self._schemas_json = None
+
+        logger.info("工具 '%s' 已成功注册并生成 schema。", tool_name)
+
+        return func
+
+    def register_many(self, funcs: Iterable[Callable]) -> List[Callable]:
+        """
+        批量注册多个工具。
+
+        与逐个调用 register 相比，只在结束时输出一条汇总日志，
+        并通过一次 extend 追加所有 schema。
+        """
+        tools = self.tools
+        build_schema = self._build_schema
+        registered = []
+        schemas = []
+        for func in funcs:
+            tools[func.__name__] = func
+            schemas.append(build_schema(func))
+            registered.append(func)
+        self.tool_schemas.extend(schemas)
+        self._schemas_json = None
+
+        logger.info(
+            "已批量注册 %d 个工具: %s",
+            len(registered),
+            [func.__name__ for func in registered],
+        )
+
+        return registered
 
-        # --- 生成 Schema ---
+    def register_pending(self) -> List[Callable]:
+        """通过 register_many 一次性注册所有被 @tool 标记、尚未注册的工具"""
+        if not self._pending_tools:
+            return []
+        pending, self._pending_tools = self._pending_tools, []
+        return self.register_many(pending)
+
+    def _build_schema(self, func: Callable) -> Dict[str, Any]:
+        """根据函数签名和文档字符串生成工具 schema"""
+        tool_name = func.__name__
         sig = inspect.signature(func)
         doc = inspect.getdoc(func)
         description = doc.split("\n")[0] if doc else ""
@@ -44,7 +90,7 @@ class ToolRegistry:
 
         logger.debug("为工具 '%s' 生成的参数 schema: %s", tool_name, parameters)
 
-        tool_schema = {
+        return {
             "type": "function",
             "function": {
                 "name": tool_name,
@@ -52,14 +98,10 @@ class ToolRegistry:
                 "parameters": parameters,
             },
         }
-        self.tool_schemas.append(tool_schema)
-
-        logger.info("工具 '%s' 已成功注册并生成 schema。", tool_name)
-
-        return func
 
     def get_tool(self, name: str) -> Callable | None:
         """根据名称获取已注册的工具函数"""
+        self.register_pending()
         tool = self.tools.get(name)
         if tool:
             logger.debug("成功获取工具: %s", name)
@@ -68,12 +110,24 @@ class ToolRegistry:
         return tool
 
     def get_all_schemas(self) -> List[Dict[str, Any]]:
-        """获取所有已注册工具的 schema 列表"""
+        """获取所有已注册工具的 schema 列表（注册中心内部的列表，调用方不得原地修改）"""
+        self.register_pending()
         logger.debug(
             "正在获取所有已注册工具的 schema，共 %d 个。", len(self.tool_schemas)
         )
         return self.tool_schemas
 
+    def get_all_schemas_json(self) -> bytes:
+        """
+        获取所有已注册工具 schema 的 JSON 字节串
+
+        结果缓存到下一次注册工具为止，可直接拼接进请求体或作为 HTTP 响应体返回。
+        """
+        self.register_pending()
+        if self._schemas_json is None:
+            self._schemas_json = orjson.dumps(self.tool_schemas)
+        return self._schemas_json
+
 
 # 实例化对象
 tool_registry = ToolRegistry()
@@ -82,10 +136,15 @@ tool_registry = ToolRegistry()
 # 装饰器函数
 def tool(func: Callable):
     """
-    一个用于注册工具的装饰器。
+    一个用于标记工具的装饰器。
+
+    被标记的函数不会在导入时立即注册，而是加入待注册列表，由 ai_tools 包
+    调用 tool_registry.register_pending 统一批量注册；之后才导入的工具会在
+    下一次获取工具或 schema 时注册。
     用法:
     @tool
     def my_function(...):
         ...
     """
-    return tool_registry.register(func)
\ No newline at end of file
+    tool_registry._pending_tools.append(func)
+    return func
\ No newline at end of file
@@ -10,15 +10,53 @@ Genesis AI 应用日志配置模块
 - 日志轮转和大小限制
 """
 
+import atexit
+import copy
+import functools
 import logging
 import logging.config
 import logging.handlers
 import json
 import os
+import queue
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _json_default(obj: Any) -> str:
+    """为非 orjson 的序列化后端处理 datetime 等特殊类型"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+# 优先使用 orjson 序列化日志，缺失时依次回退到 ujson 和标准库 json
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def _json_dumps(data: Dict[str, Any]) -> str:
+        return orjson.dumps(data, option=_ORJSON_OPTIONS, default=str).decode()
+
+except ImportError:
+    try:
+        import ujson
+
+        def _json_dumps(data: Dict[str, Any]) -> str:
+            return ujson.dumps(data, ensure_ascii=False, default=_json_default)
+
+    except ImportError:
+
+        def _json_dumps(data: Dict[str, Any]) -> str:
+            return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+# 未携带耗时信息的日志记录共享的默认值，避免每条记录分配新字典
+_ZERO_DURATION = {'ms': 0}
 
 
 class RequestIdFilter(logging.Filter):
@@ -26,8 +64,7 @@ class RequestIdFilter(logging.Filter):
     
     def filter(self, record):
         # 如果record中没有request_id，设置为N/A
-        if not hasattr(record, 'request_id'):
-            record.request_id = getattr(record, 'request_id', 'N/A')
+        record.__dict__.setdefault('request_id', 'N/A')
         return True
 
 
@@ -36,73 +73,252 @@ class DurationFilter(logging.Filter):
     
     def filter(self, record):
         # 如果record中没有duration，设置为0ms
-        if not hasattr(record, 'duration'):
-            record.duration = getattr(record, 'duration', {'ms': 0})
+        record.__dict__.setdefault('duration', _ZERO_DURATION)
         return True
 
 
 class CustomJSONFormatter(logging.Formatter):
-    """自定义JSON日志格式化器"""
+    """
+    自定义JSON日志格式化器
+
+    依赖 RequestIdFilter 和 DurationFilter 保证 request_id、duration 字段始终存在。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 预先绑定热路径上使用的函数
+        self._utcfromtimestamp = datetime.utcfromtimestamp
+        self._dumps = _json_dumps
     
     def format(self, record):
-        # 创建基础日志数据
+        # 填充基础日志数据
         log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'message': record.getMessage(),
+            # 使用记录创建时间，而不是在后台线程中格式化时的时间
+            'timestamp': self._utcfromtimestamp(record.created),
+            'message': record.getMessage() if record.args else str(record.msg),
             'name': record.name,
             'levelname': record.levelname,
+            'request_id': record.request_id,
+            'duration': record.duration,
         }
         
-        # 添加请求ID
-        if hasattr(record, 'request_id'):
-            log_data['request_id'] = record.request_id
-        
-        # 添加耗时信息
-        if hasattr(record, 'duration'):
-            log_data['duration'] = record.duration
-        
-        # 添加异常信息
+        # 添加异常信息（格式化结果缓存在 exc_text 中，供同一记录的其他处理器复用）
         if record.exc_info:
-            log_data['exc_info'] = self.formatException(record.exc_info)
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_data['exc_info'] = record.exc_text
         
-        # 添加额外字段
-        if hasattr(record, 'extra'):
-            log_data.update(record.extra)
+        return self._dumps(log_data)
+
+
+class SizedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    只按当前文件大小判断是否轮转的 RotatingFileHandler
+
+    标准实现会在 shouldRollover 中再格式化一次记录来计算长度（CPython issue 116267），
+    这里改为只检查文件当前位置，代价是备份文件可能略超过 maxBytes。
+    """
+
+    def shouldRollover(self, record):
+        return (
+            self.maxBytes > 0
+            and self.stream is not None
+            and self.stream.tell() >= self.maxBytes
+        )
+
+
+class _RoutingQueueHandler(logging.handlers.QueueHandler):
+    """
+    将日志记录连同目标处理器一起放入队列的 QueueHandler
+
+    每个 logger 挂载一个实例，记录在后台线程中只分发给该 logger 原本配置的处理器，
+    从而在移出 I/O 的同时保持各日志文件的路由关系不变。
+    """
+
+    def __init__(self, log_queue, targets):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)
+
+    def prepare(self, record):
+        # 只合并消息参数，保留 exc_info 交由后台线程中的格式化器处理
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self.queue.put_nowait((record, self.targets))
+
+
+class _RoutingQueueListener(logging.handlers.QueueListener):
+    """
+    在后台线程中将队列中的日志记录分发给其目标处理器
+
+    log_access 放入的访问日志条目不是 LogRecord：监听器一次取出紧随其后的
+    全部访问日志条目，在本线程中构造记录并批量写出。
+    """
+
+    def handle(self, item):
+        record, targets = item
+        if isinstance(record, logging.LogRecord):
+            for handler in targets:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
         
-        return json.dumps(log_data, ensure_ascii=False, default=str)
+        # 同一队列中的访问日志条目都指向 genesis.access 的处理器，可以合并写出
+        batch = [record]
+        pending = None
+        while True:
+            try:
+                pending = self.queue.get_nowait()
+            except queue.Empty:
+                pending = None
+                break
+            if pending is self._sentinel or isinstance(pending[0], logging.LogRecord):
+                break
+            batch.append(pending[0])
+        _write_access_batch(batch, targets)
+        
+        if pending is self._sentinel:
+            # 停止标记放回队列，由监听线程照常退出
+            self.queue.put_nowait(pending)
+        elif pending is not None:
+            self.handle(pending)
 
 
-def setup_logging(
-    log_level: str = "INFO",
-    log_dir: str = "logs",
-    max_file_size: int = 10 * 1024 * 1024,  # 10MB
-    backup_count: int = 5,
-    enable_console: bool = True,
-    enable_file: bool = True
+def _make_access_record(entry: Tuple[float, Dict[str, Any]]) -> logging.LogRecord:
+    """由 log_access 的 (创建时间, payload) 构造 genesis.access 的 INFO 记录"""
+    created, payload = entry
+    record = logging.makeLogRecord(payload)
+    record.name = _ACCESS_LOGGER_NAME
+    record.msg = payload.get('message', '')
+    record.levelno = logging.INFO
+    record.levelname = 'INFO'
+    record.created = created
+    record.msecs = (created - int(created)) * 1000
+    return record
+
+
+def _write_access_batch(
+    entries: List[Tuple[float, Dict[str, Any]]], targets: Tuple[logging.Handler, ...]
 ):
     """
-    设置日志配置
-    
-    Args:
-        log_level: 日志级别
-        log_dir: 日志目录
-        max_file_size: 单个日志文件最大大小
-        backup_count: 备份文件数量
-        enable_console: 是否启用控制台输出
-        enable_file: 是否启用文件输出
+    将一批访问日志写入 genesis.access 配置的处理器
+
+    流式处理器（控制台、轮转文件）在持有处理器锁时一次写入整批格式化结果，
+    轮转仍按该处理器配置的文件大小判断；其他处理器逐条 handle。
+    """
+    records = [_make_access_record(entry) for entry in entries]
+    for handler in targets:
+        if handler.level > logging.INFO:
+            continue
+        stream = getattr(handler, 'stream', None)
+        if not isinstance(handler, logging.StreamHandler) or stream is None:
+            # 非流式处理器，或延迟打开文件（delay=True）尚未打开
+            for record in records:
+                handler.handle(record)
+            continue
+        
+        handler.acquire()
+        try:
+            data = ''.join(
+                handler.format(record) + handler.terminator
+                for record in records
+                if handler.filter(record)
+            )
+            if not data:
+                continue
+            if (
+                isinstance(handler, logging.handlers.RotatingFileHandler)
+                and handler.maxBytes > 0
+                and handler.stream.tell() >= handler.maxBytes
+            ):
+                handler.doRollover()
+            handler.stream.write(data)
+            handler.flush()
+        except Exception:
+            handler.handleError(records[0])
+        finally:
+            handler.release()
+
+
+# 当前运行中的日志队列监听器
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+# 被替换为队列处理器的 logger：(logger, 队列处理器, 原处理器)，停止监听器时还原
+_queue_routes: List[Tuple[logging.Logger, logging.Handler, Tuple[logging.Handler, ...]]] = []
+
+# 当前生效的 setup_logging 参数
+_configured_key: Optional[tuple] = None
+
+_ACCESS_LOGGER_NAME = 'genesis.access'
+
+# genesis.access 在日志队列中的路由：(队列, 目标处理器)；未经 configure_logging 配置时为 None
+_access_route: Optional[Tuple[queue.SimpleQueue, Tuple[logging.Handler, ...]]] = None
+
+
+def log_access(payload: Dict[str, Any]):
+    """
+    记录一条 genesis.access 的 INFO 访问日志
+
+    payload 包含 message 和其余日志字段（等同于 extra）。日志系统经 configure_logging
+    配置后，调用方只把 payload 放入日志队列，不构造 LogRecord、不经过过滤器和格式化器；
+    由监听线程批量格式化并写入 genesis.access 配置的处理器，日志目录、文件大小和
+    轮转设置均与该处理器一致。放入队列后调用方不得再修改 payload。
+    """
+    route = _access_route
+    if route is None:
+        fields = dict(payload)
+        message = fields.pop('message', '')
+        logging.getLogger(_ACCESS_LOGGER_NAME).info(message, extra=fields)
+        return
+    log_queue, targets = route
+    log_queue.put_nowait(((time.time(), payload), targets))
+
+
+def shutdown_logging():
+    """
+    停止日志队列监听器，并将队列中剩余的日志写出
+
+    各 logger 恢复为直接使用原处理器，之后的日志同步写出而不会滞留在队列中。
+    """
+    global _queue_listener, _configured_key, _access_route
+    _access_route = None
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+    for configured_logger, queue_handler, targets in _queue_routes:
+        configured_logger.removeHandler(queue_handler)
+        for handler in targets:
+            configured_logger.addHandler(handler)
+    _queue_routes.clear()
+    _configured_key = None
+
+
+atexit.register(shutdown_logging)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_config(
+    log_level: str,
+    log_dir: str,
+    max_file_size: int,
+    backup_count: int,
+    enable_console: bool,
+    enable_file: bool
+) -> Dict[str, Any]:
+    """
+    构建 dictConfig 使用的日志配置字典
+
+    结果按参数缓存，调用方不得修改返回的字典。
     """
-    # 确保日志目录存在
-    log_path = Path(log_dir)
-    log_path.mkdir(exist_ok=True)
-    
     # 创建日志文件路径
+    log_path = Path(log_dir)
     access_log_path = log_path / "access.log"
     app_log_path = log_path / "app.log"
     error_log_path = log_path / "error.log"
     
-    # 配置日志格式
-    json_formatter = CustomJSONFormatter()
-    
     # 基础配置
     config = {
         'version': 1,
@@ -138,7 +354,7 @@ def setup_logging(
     if enable_file:
         # Access日志处理器
         config['handlers']['access_file'] = {
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': f'{__name__}.SizedRotatingFileHandler',
             'level': 'INFO',
             'formatter': 'json',
             'filters': ['request_id', 'duration'],
@@ -150,7 +366,7 @@ def setup_logging(
         
         # App日志处理器
         config['handlers']['app_file'] = {
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': f'{__name__}.SizedRotatingFileHandler',
             'level': log_level,
             'formatter': 'json',
             'filters': ['request_id', 'duration'],
@@ -162,7 +378,7 @@ def setup_logging(
         
         # Error日志处理器
         config['handlers']['error_file'] = {
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': f'{__name__}.SizedRotatingFileHandler',
             'level': 'ERROR',
             'formatter': 'json',
             'filters': ['request_id', 'duration'],
@@ -179,20 +395,11 @@ def setup_logging(
     if enable_file:
         root_handlers.append('app_file')
     
-    if root_handlers:
-        config['handlers']['root'] = {
-            'class': 'logging.StreamHandler',
-            'level': log_level,
-            'formatter': 'json',
-            'filters': ['request_id', 'duration'],
-            'handlers': root_handlers,
-        }
-    
     # 配置具体logger
     loggers_config = {
         '': {  # root logger
             'level': log_level,
-            'handlers': ['root'] if enable_console else ['app_file'],
+            'handlers': root_handlers,
             'propagate': False,
         },
         'genesis': {
@@ -233,10 +440,97 @@ def setup_logging(
     }
     
     config['loggers'] = loggers_config
+    return config
+
+
+def configure_logging(config: Dict[str, Any]) -> logging.handlers.QueueListener:
+    """
+    应用 dictConfig 配置字典，并将格式化和写入移到后台线程
+
+    配置中各 logger（含 root）上的处理器被替换为队列处理器，记录在
+    QueueListener 线程中只分发给该 logger 原本配置的处理器。
+    应用关闭时调用 shutdown_logging 停止监听器。
+
+    Args:
+        config: logging.config.dictConfig 格式的配置字典
+
+    Returns:
+        后台写日志的 QueueListener
+    """
+    global _queue_listener, _access_route
+    
+    # 重新配置前先停止旧的监听器，确保其队列中的日志写完
+    shutdown_logging()
     
     # 应用配置
     logging.config.dictConfig(config)
     
+    logger_names = list(config.get('loggers', ()))
+    if 'root' in config:
+        logger_names.append('')
+    
+    # 将各 logger 上的实际处理器替换为队列处理器，由后台线程统一写入
+    log_queue = queue.SimpleQueue()
+    real_handlers = []
+    access_route = None
+    for logger_name in dict.fromkeys(logger_names):
+        configured_logger = logging.getLogger(logger_name)
+        targets = tuple(configured_logger.handlers)
+        if not targets:
+            continue
+        for handler in targets:
+            configured_logger.removeHandler(handler)
+            if handler not in real_handlers:
+                real_handlers.append(handler)
+        queue_handler = _RoutingQueueHandler(log_queue, targets)
+        configured_logger.addHandler(queue_handler)
+        _queue_routes.append((configured_logger, queue_handler, targets))
+        if logger_name == _ACCESS_LOGGER_NAME:
+            access_route = (log_queue, targets)
+    
+    _queue_listener = _RoutingQueueListener(
+        log_queue, *real_handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+    _access_route = access_route
+    return _queue_listener
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_dir: str = "logs",
+    max_file_size: int = 10 * 1024 * 1024,  # 10MB
+    backup_count: int = 5,
+    enable_console: bool = True,
+    enable_file: bool = True
+):
+    """
+    设置日志配置
+    
+    Args:
+        log_level: 日志级别
+        log_dir: 日志目录
+        max_file_size: 单个日志文件最大大小
+        backup_count: 备份文件数量
+        enable_console: 是否启用控制台输出
+        enable_file: 是否启用文件输出
+    
+    Returns:
+        后台写日志的 QueueListener。各 logger 上只挂载 QueueHandler，
+        格式化和文件写入都在监听器线程中完成。
+    """
+    global _queue_listener, _configured_key
+    
+    # 参数未变且日志系统仍在运行时，无需重新 dictConfig（避免重复打开日志文件）
+    key = (log_level, log_dir, max_file_size, backup_count, enable_console, enable_file)
+    if key == _configured_key and _queue_listener is not None and logging.getLogger().hasHandlers():
+        return _queue_listener
+    
+    # 确保日志目录存在
+    Path(log_dir).mkdir(exist_ok=True)
+    configure_logging(_build_config(*key))
+    _configured_key = key
+    
     # 创建logger实例
     logger = logging.getLogger(__name__)
     logger.info("日志系统初始化完成", extra={
@@ -246,7 +540,7 @@ def setup_logging(
         'enable_file': enable_file,
     })
     
-    return logger
+    return _queue_listener
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -325,14 +619,17 @@ def log_error(
                 'message': str(error),
                 'context': context or {},
             },
-            'exc_info': True,
-        }
+        },
+        exc_info=True,
     )
 
 
 # 导出函数和类
 __all__ = [
     'setup_logging',
+    'configure_logging',
+    'shutdown_logging',
+    'log_access',
     'get_logger',
     'RequestIdFilter',
     'DurationFilter',
@@ -10,136 +10,149 @@ Genesis AI 应用中间件模块
 """
 
 import time
-import uuid
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from os import urandom
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.genesis.core.logging_config import log_access
 
 logger = logging.getLogger(__name__)
 
+# 访问日志和性能日志使用的 logger，在模块加载时获取一次
+_ACCESS_LOGGER = logging.getLogger("genesis.access")
+_PERF_LOGGER = logging.getLogger("genesis.performance")
+
+
+class RequestContextMiddleware:
+    """
+    请求上下文中间件（纯 ASGI 实现）
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    """请求ID中间件，为每个请求生成唯一ID"""
+    在一次请求处理中完成请求ID生成、耗时统计、访问日志和性能日志记录，
+    并写入 X-Request-ID 和 X-Processing-Time 响应头。
+    不使用 BaseHTTPMiddleware，避免其按块转发响应体带来的额外开销；
+    日志未启用时不会创建任何 Request/URL 对象。
+    """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # 生成请求ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # 记录请求开始
-        start_time = time.time()
-        access_logger = logging.getLogger("genesis.access")
+        # 生成请求ID（32位十六进制字符串），通过 request.state.request_id 供路由使用
+        request_id = urandom(16).hex()
+        scope.setdefault("state", {})["request_id"] = request_id
         
-        access_logger.info(
-            f"请求开始: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "url": str(request.url),
-                "user_agent": request.headers.get("user-agent", ""),
-                "ip_address": request.client.host if request.client else ""
-            }
-        )
+        # 记录请求开始
+        start = time.perf_counter()
+        access_logger = _ACCESS_LOGGER
+        perf_logger = _PERF_LOGGER
+        method = scope["method"]
+        path = scope["path"]
+        url_str = ""
+        status_code = None
         
-        try:
-            # 处理请求
-            response = await call_next(request)
-            
-            # 计算耗时
-            duration_ms = round((time.time() - start_time) * 1000, 2)
-            
-            # 记录请求完成
+        # 日志级别未启用时跳过构建 extra 字典和序列化 URL
+        if access_logger.isEnabledFor(logging.INFO):
+            url_str = str(URL(scope=scope))
+            client = scope.get("client")
             access_logger.info(
-                f"请求已处理: {request.method} {request.url.path}",
+                f"请求开始: {method} {path}",
                 extra={
                     "request_id": request_id,
-                    "method": request.method,
-                    "url": str(request.url),
-                    "status_code": response.status_code,
-                    "duration": duration_ms
+                    "method": method,
+                    "url": url_str,
+                    "user_agent": self._get_user_agent(scope),
+                    "ip_address": client[0] if client else ""
                 }
             )
-            
-            # 在响应头中添加请求ID
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
-        except Exception as e:
-            # 记录请求异常
-            duration_ms = round((time.time() - start_time) * 1000, 2)
-            access_logger.error(
-                f"请求处理失败: {request.method} {request.url.path} - {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "url": str(request.url),
-                    "duration": duration_ms
-                },
-                exc_info=True
-            )
-            raise
-
-
-class TimingMiddleware(BaseHTTPMiddleware):
-    """性能监控中间件，记录请求耗时"""
-    
-    def __init__(self, app):
-        super().__init__(app)
-        self.logger = logging.getLogger("genesis.performance")
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - start
+                # 在响应头中添加请求ID和处理时间
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                headers.append((b"x-processing-time", f"{elapsed:.4f}".encode()))
+                message["headers"] = headers
+            await send(message)
         
         try:
-            response = await call_next(request)
-            
-            # 计算处理时间
-            processing_time = time.time() - start_time
-            
-            # 记录性能日志
-            if hasattr(request.state, 'request_id'):
-                self.logger.info(
-                    f"性能监控: {request.method} {request.url.path}",
+            # 处理请求
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # 记录请求异常
+            processing_time = time.perf_counter() - start
+            if access_logger.isEnabledFor(logging.ERROR):
+                url_str = url_str or str(URL(scope=scope))
+                access_logger.error(
+                    f"请求处理失败: {method} {path} - {str(e)}",
                     extra={
-                        "request_id": request.state.request_id,
-                        "method": request.method,
-                        "url": str(request.url),
-                        "processing_time": round(processing_time, 4),
-                        "status_code": response.status_code
-                    }
+                        "request_id": request_id,
+                        "method": method,
+                        "url": url_str,
+                        "duration": round(processing_time * 1000.0, 2)
+                    },
+                    exc_info=True
                 )
-            
-            # 在响应头中添加处理时间
-            response.headers["X-Processing-Time"] = f"{processing_time:.4f}"
-            
-            return response
-            
-        except Exception as e:
-            # 计算处理时间
-            processing_time = time.time() - start_time
-            
-            # 记录性能日志
-            if hasattr(request.state, 'request_id'):
-                self.logger.error(
-                    f"性能监控: 请求处理失败 - {request.method} {request.url.path}",
+            if perf_logger.isEnabledFor(logging.ERROR):
+                perf_logger.error(
+                    f"性能监控: 请求处理失败 - {method} {path}",
                     extra={
-                        "request_id": request.state.request_id,
-                        "method": request.method,
-                        "url": str(request.url),
+                        "request_id": request_id,
+                        "method": method,
+                        "url": url_str or str(URL(scope=scope)),
                         "processing_time": round(processing_time, 4),
                         "error": str(e)
                     },
                     exc_info=True
                 )
-            
-            # 重新抛出异常
             raise
+        
+        # 记录请求完成和性能日志
+        processing_time = time.perf_counter() - start
+        if access_logger.isEnabledFor(logging.INFO):
+            # 成功路径直接放入日志队列，不构造 LogRecord
+            log_access({
+                "message": f"请求已处理: {method} {path}",
+                "request_id": request_id,
+                "method": method,
+                "url": url_str,
+                "status_code": status_code,
+                "duration": round(processing_time * 1000.0, 2)
+            })
+        if perf_logger.isEnabledFor(logging.INFO):
+            perf_logger.info(
+                f"性能监控: {method} {path}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "url": url_str or str(URL(scope=scope)),
+                    "processing_time": round(processing_time, 4),
+                    "status_code": status_code
+                }
+            )
+    
+    @staticmethod
+    def _get_user_agent(scope: Scope) -> str:
+        """从 ASGI scope 的原始请求头中读取 User-Agent"""
+        for name, value in scope.get("headers", ()):
+            if name == b"user-agent":
+                return value.decode("latin-1")
+        return ""
+
+
+# 兼容旧名称：请求ID与耗时统计已合并到 RequestContextMiddleware
+RequestIdMiddleware = RequestContextMiddleware
 
 
 # 导出中间件类
 __all__ = [
+    'RequestContextMiddleware',
     'RequestIdMiddleware',
-    'TimingMiddleware'
-]
\ No newline at end of file
+]
@@ -10,19 +10,112 @@ Genesis AI 应用配置管理模块
 使用 pydantic-settings 提供类型安全的配置访问。
 """
 
+import functools
 import os
+from dataclasses import make_dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, List, Optional, Union
 
-from pydantic import AnyHttpUrl, Field
+from pydantic import AnyHttpUrl, BaseModel, Field, PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
+import orjson
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:  # 未编译 libyaml 时回退到纯 Python 解析器
+    from yaml import SafeLoader as _YAMLLoader
+
 # Load environment variables from .env file
 load_dotenv()
 
 
+def _load_yaml_config(yaml_path: Path) -> Dict[str, Any]:
+    """
+    加载 YAML 配置文件，解析结果按文件修改时间缓存到同目录的 .{name}.cache.json
+
+    缓存比 YAML 文件新时直接用 orjson 读取缓存，跳过 YAML 解析；缓存只是数据，
+    读取时不会执行任何代码。缓存缺失、过期或损坏时重新解析并尝试回写
+    （配置目录只读时忽略写入失败）；解析结果无法原样存为 JSON 时（如日期、
+    非字符串键）不写缓存。
+    """
+    cache_path = yaml_path.with_name(f".{yaml_path.name}.cache.json")
+    try:
+        if cache_path.stat().st_mtime >= yaml_path.stat().st_mtime:
+            cached = orjson.loads(cache_path.read_bytes())
+            if isinstance(cached, dict):
+                return cached
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YAMLLoader) or {}
+    
+    try:
+        encoded = orjson.dumps(data)
+        if orjson.loads(encoded) == data:
+            cache_path.write_bytes(encoded)
+    except (OSError, TypeError):
+        pass
+    return data
+
+
+def _load_config(config_dir: Path, name: str) -> Optional[Dict[str, Any]]:
+    """
+    加载名为 name 的配置，优先使用构建时导出的 {name}.json
+
+    JSON 经 orjson 解析，完全绕过 YAML；JSON 比同名 YAML 旧时视为过期，
+    改为加载 YAML。两者都不存在时返回 None。
+    """
+    yaml_path = config_dir / f"{name}.yaml"
+    json_path = config_dir / f"{name}.json"
+    try:
+        json_mtime = json_path.stat().st_mtime
+    except OSError:
+        json_mtime = None
+    
+    if json_mtime is not None:
+        try:
+            yaml_mtime = yaml_path.stat().st_mtime
+        except OSError:
+            yaml_mtime = None
+        if yaml_mtime is None or json_mtime >= yaml_mtime:
+            return orjson.loads(json_path.read_bytes()) or {}
+    
+    if yaml_path.exists():
+        return _load_yaml_config(yaml_path)
+    return None
+
+
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """递归合并两个字典，override 中的值优先；不修改入参"""
+    result = dict(base)
+    for key, value in override.items():
+        current = result.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            result[key] = _deep_merge(current, value)
+        else:
+            result[key] = value
+    return result
+
+
+def _known_fields(model_cls: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """按模型字段递归过滤配置字典，丢弃模型中不存在的键（如 database.url）"""
+    fields = model_cls.model_fields
+    result = {}
+    for key, value in data.items():
+        field = fields.get(key)
+        if field is None:
+            continue
+        annotation = field.annotation
+        if isinstance(value, dict) and isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            value = _known_fields(annotation, value)
+        result[key] = value
+    return result
+
+
 class ServerConfig(BaseSettings):
     """服务器配置"""
     host: str = "0.0.0.0"
@@ -65,10 +158,34 @@ class DatabaseConfig(BaseSettings):
     pool_recycle: int = 3600
     echo: bool = False
     
+    # 预先构建的连接URL，组成字段被修改时失效
+    _url: Optional[str] = PrivateAttr(default=None)
+    _URL_FIELDS: ClassVar[frozenset] = frozenset({"user", "password", "host", "port", "name"})
+    
+    def model_post_init(self, __context: Any) -> None:
+        self._url = self._build_url()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._URL_FIELDS:
+            self._url = None
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False):
+        # model_copy(update=...) 直接写入字段而不经过 __setattr__，需要单独让缓存失效
+        copied = super().model_copy(update=update, deep=deep)
+        if update and self._URL_FIELDS.intersection(update):
+            copied._url = None
+        return copied
+    
+    def _build_url(self) -> str:
+        return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
+    
     @property
     def url(self) -> str:
-        """构建数据库连接URL"""
-        return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
+        """数据库连接URL"""
+        if self._url is None:
+            self._url = self._build_url()
+        return self._url
 
 
 class RedisConfig(BaseSettings):
@@ -80,6 +197,37 @@ class RedisConfig(BaseSettings):
     decode_responses: bool = True
     ssl: bool = False
     ttl: int = 3600
+    
+    # 预先构建的连接URL，组成字段被修改时失效
+    _url: Optional[str] = PrivateAttr(default=None)
+    _URL_FIELDS: ClassVar[frozenset] = frozenset({"host", "port", "db", "password"})
+    
+    def model_post_init(self, __context: Any) -> None:
+        self._url = self._build_url()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._URL_FIELDS:
+            self._url = None
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False):
+        # model_copy(update=...) 直接写入字段而不经过 __setattr__，需要单独让缓存失效
+        copied = super().model_copy(update=update, deep=deep)
+        if update and self._URL_FIELDS.intersection(update):
+            copied._url = None
+        return copied
+    
+    def _build_url(self) -> str:
+        if self.password:
+            return f"redis://:{self.password}@{self.host}:{self.port}/{self.db}"
+        return f"redis://{self.host}:{self.port}/{self.db}"
+    
+    @property
+    def url(self) -> str:
+        """Redis 连接URL"""
+        if self._url is None:
+            self._url = self._build_url()
+        return self._url
 
 
 class CacheSettings(BaseSettings):
@@ -326,43 +474,26 @@ class Settings(BaseSettings):
         self._load_config_from_files()
     
     def _load_config_from_files(self):
-        """从 YAML 文件加载配置"""
+        """从配置文件（JSON 或 YAML）加载配置"""
         # 获取配置目录
         config_dir = Path(__file__).parent.parent.parent.parent / self.config_dir
         
-        # 加载默认配置
-        default_config_path = config_dir / "default.yaml"
-        if default_config_path.exists():
-            with open(default_config_path, "r", encoding="utf-8") as f:
-                default_config = yaml.safe_load(f) or {}
-                self._update_from_dict(default_config)
+        # 加载默认配置和环境特定配置，合并为一个字典
+        merged_config: Dict[str, Any] = {}
+        for name in ("default", self.env):
+            file_config = _load_config(config_dir, name)
+            if file_config:
+                merged_config = _deep_merge(merged_config, file_config)
+        if not merged_config:
+            return
         
-        # 加载环境特定配置
-        env_config_path = config_dir / f"{self.env}.yaml"
-        if env_config_path.exists():
-            with open(env_config_path, "r", encoding="utf-8") as f:
-                env_config = yaml.safe_load(f) or {}
-                self._update_from_dict(env_config)
-    
-    def _update_from_dict(self, config_dict: Dict[str, Any]):
-        """从字典更新配置"""
-        for key, value in config_dict.items():
-            if hasattr(self, key):
-                current_value = getattr(self, key)
-                if isinstance(current_value, BaseSettings):
-                    # 如果是嵌套配置对象，递归更新
-                    if isinstance(value, dict):
-                        for sub_key, sub_value in value.items():
-                            if hasattr(current_value, sub_key):
-                                # 跳过只读属性（如url属性）
-                                if sub_key == 'url':
-                                    continue
-                                setattr(current_value, sub_key, sub_value)
-                else:
-                    # 跳过只读属性
-                    if key == 'url':
-                        continue
-                    setattr(self, key, value)
+        # 一次性交给 pydantic-core 校验，再把结果写回当前实例
+        merged_settings = type(self).model_validate(
+            _deep_merge(self.model_dump(), _known_fields(type(self), merged_config))
+        )
+        for name, field in type(self).model_fields.items():
+            if not field.exclude:
+                object.__setattr__(self, name, getattr(merged_settings, name))
     
     @property
     def is_development(self) -> bool:
@@ -380,25 +511,88 @@ class Settings(BaseSettings):
     
     def get_redis_url(self) -> str:
         """获取 Redis 连接 URL"""
-        redis_config = self.cache.redis
-        if redis_config.password:
-            return f"redis://:{redis_config.password}@{redis_config.host}:{redis_config.port}/{redis_config.db}"
-        return f"redis://{redis_config.host}:{redis_config.port}/{redis_config.db}"
+        return self.cache.redis.url
     
     def get_llm_provider_config(self, provider: str) -> Optional[LLMProviderConfig]:
         """获取指定 LLM 提供商的配置"""
         return getattr(self.llm.providers, provider, None)
 
 
-# 创建全局设置实例
-settings = Settings()
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """获取全局设置实例（首次调用时创建，之后复用同一实例）"""
+    return Settings()
+
+
+# 配置模型类 -> 对应的冻结 dataclass 类型
+_FROZEN_TYPES: Dict[type, type] = {}
+
+
+def _freeze_value(value: Any) -> Any:
+    """把配置值转换为只读形式：嵌套模型转为冻结 dataclass，dict 转为只读映射，list 转为 tuple"""
+    if isinstance(value, BaseModel):
+        return _freeze(value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze_value(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _freeze(model: BaseModel, **extra: Any) -> Any:
+    """递归地把配置模型转换为 frozen + slots 的 dataclass 实例"""
+    values: Dict[str, Any] = {}
+    annotations: Dict[str, Any] = {}
+    for name, field in type(model).model_fields.items():
+        if field.exclude:
+            continue
+        value = getattr(model, name)
+        frozen_value = _freeze_value(value)
+        values[name] = frozen_value
+        # 转换过的值（嵌套模型、容器）标注为转换后的类型，其余沿用模型字段的类型
+        annotations[name] = field.annotation if frozen_value is value else type(frozen_value)
+    for name, value in extra.items():
+        values[name] = _freeze_value(value)
+        annotations[name] = type(values[name])
+    
+    frozen_cls = _FROZEN_TYPES.get(type(model))
+    if frozen_cls is None:
+        frozen_cls = make_dataclass(
+            f"Frozen{type(model).__name__}",
+            list(annotations.items()),
+            frozen=True,
+            slots=True,
+        )
+        _FROZEN_TYPES[type(model)] = frozen_cls
+    return frozen_cls(**values)
+
+
+@functools.lru_cache(maxsize=1)
+def get_frozen_settings() -> Any:
+    """
+    获取全局设置的只读快照
+    
+    字段与 Settings 相同，但属性访问是普通的 slot 读取，不经过 pydantic
+    的描述符机制，适合请求处理等热路径；dict 和 list 类型的配置分别转为
+    只读映射和 tuple，另附 env。运行期修改 Settings 不会反映到快照中。
+    """
+    current = get_settings()
+    return _freeze(current, env=current.env)
 
 
-# 为方便使用，导出常用的配置项
-def get_settings() -> Settings:
-    """获取全局设置实例"""
-    return settings
+def __getattr__(name: str) -> Any:
+    """延迟创建全局设置实例，兼容 `from ...settings import settings` 的用法"""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # 导出配置实例供应用各处使用
-__all__ = ["settings", "get_settings", "Settings"]
\ No newline at end of file
+__all__ = [
+    "settings",
+    "get_settings",
+    "get_frozen_settings",
+    "Settings",
+]
\ No newline at end of file
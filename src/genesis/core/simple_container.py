@@ -2,51 +2,33 @@
 Genesis AI 应用简化依赖注入容器
 ============================
 
-本模块提供简化的依赖注入容器，只包含数据库相关功能。
+兼容旧导入路径，实际实现位于 simple_container_fixed 模块。
 """
 
-from dependency_injector import containers, providers
+from typing import Any
 
-from .settings import settings
+from .simple_container_fixed import (
+    Application,
+    CoreProviders,
+    get_container,
+    init_resources,
+    shutdown_resources,
+)
 
 
-class CoreProviders(containers.DeclarativeContainer):
-    """核心服务提供商容器"""
-    
-    # 配置提供者
-    config = providers.Configuration()
-    config.from_pydantic(settings)
-    
-    # 数据库管理器提供者
-    db_manager = providers.Singleton(
-        "genesis.infrastructure.database.manager.DatabaseManager",
-        config=config.database,
-    )
-    
-    # 数据库引擎提供者
-    db_engine = providers.DelegatedFactory(
-        db_manager.provided.engine,
-    )
+def __getattr__(name: str) -> Any:
+    """延迟获取全局容器实例，与 simple_container_fixed.container 为同一对象"""
+    if name == "container":
+        return get_container()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-class Application(containers.DeclarativeContainer):
-    """应用程序容器"""
-    
-    # 核心服务
-    core = providers.Container(CoreProviders)
-
-
-# 创建全局容器实例
-container = Application()
-
-# 异步初始化方法
-async def init_resources():
-    """初始化容器资源"""
-    pass
-
-async def shutdown_resources():
-    """关闭容器资源"""
-    pass
-
 # 导出容器实例
-__all__ = ["container", "init_resources", "shutdown_resources"]
\ No newline at end of file
+__all__ = [
+    "container",
+    "get_container",
+    "init_resources",
+    "shutdown_resources",
+    "Application",
+    "CoreProviders",
+]
@@ -3,19 +3,23 @@ Genesis AI 应用简化依赖注入容器
 ============================
 
 本模块提供简化的依赖注入容器，只包含数据库相关功能。
+simple_container 模块是本模块的兼容别名。
 """
 
+import functools
+from typing import Any
+
 from dependency_injector import containers, providers
 
-from src.genesis.core.settings import settings
+from src.genesis.core.logging_config import shutdown_logging
+from src.genesis.core.settings import get_settings
 
 
 class CoreProviders(containers.DeclarativeContainer):
     """核心服务提供商容器"""
     
-    # 配置提供者
+    # 配置提供者（在 get_container 中从 Settings 加载）
     config = providers.Configuration()
-    config.from_pydantic(settings)
     
     # 数据库管理器提供者
     db_manager = providers.Singleton(
@@ -51,10 +55,51 @@ class Application(containers.DeclarativeContainer):
         except Exception:
             # 忽略关闭时的错误
             pass
+        
+        # 停止后台日志线程，写出队列中剩余的日志
+        shutdown_logging()
+
+
+@functools.lru_cache(maxsize=1)
+def get_container() -> Application:
+    """获取全局容器实例（首次调用时创建并加载配置，之后复用同一实例）"""
+    app_container = Application()
+    app_container.core.config.from_pydantic(get_settings())
+    return app_container
+
+
+def __getattr__(name: str) -> Any:
+    """延迟创建全局容器实例，兼容 `from ... import container` 的用法"""
+    if name == "container":
+        return get_container()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# 创建全局容器实例
-container = Application()
+async def init_resources():
+    """初始化全局容器的资源"""
+    db_manager = get_container().core.db_manager()
+    await db_manager.initialize()
+
+
+async def shutdown_resources():
+    """关闭全局容器的资源"""
+    try:
+        db_manager = get_container().core.db_manager()
+        await db_manager.close()
+    except Exception:
+        # 忽略关闭时的错误
+        pass
+    
+    # 停止后台日志线程，写出队列中剩余的日志
+    shutdown_logging()
+
 
 # 导出容器实例
-__all__ = ["container"]
\ No newline at end of file
+__all__ = [
+    "container",
+    "get_container",
+    "init_resources",
+    "shutdown_resources",
+    "Application",
+    "CoreProviders",
+]
\ No newline at end of file
@@ -6,9 +6,57 @@
 
 import json
 import logging
+import os
+import queue
+import sys
+import threading
 import time
+import traceback
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import orjson
+
+# orjson 原生支持 datetime/UUID，只有其他类型才回调 default
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# LogRecord 自带的属性以及单独处理的字段，不作为额外字段输出
+_RESERVED_RECORD_ATTRS: frozenset = frozenset({
+    'args', 'asctime', 'created', 'exc_info', 'exc_text', 'filename',
+    'funcName', 'levelname', 'levelno', 'lineno', 'module', 'msecs',
+    'message', 'msg', 'name', 'pathname', 'process', 'processName',
+    'relativeCreated', 'stack_info', 'thread', 'threadName',
+    'request_id', 'duration'
+})
+
+# 访问日志输出的 HTTP 相关字段
+_HTTP_ATTRS = ('method', 'url', 'status_code', 'user_agent', 'ip_address')
+
+
+@lru_cache(maxsize=4)
+def _iso_ts(sec: int) -> str:
+    """按整秒缓存的 ISO 8601 时间字符串（本地时间，不含小数秒）"""
+    return datetime.fromtimestamp(sec).isoformat()
+
+
+def _format_timestamp(created: float) -> str:
+    """将 LogRecord.created 格式化为带微秒的 ISO 8601 字符串"""
+    sec = int(created)
+    return f"{_iso_ts(sec)}.{int((created - sec) * 1e6):06d}"
+
+
+@lru_cache(maxsize=256)
+def _name_level_prefix(name: str, levelname: str) -> bytes:
+    """logger 名称和级别对应的 JSON 片段（不含花括号），每种组合只编码一次"""
+    return orjson.dumps({"name": name, "levelname": levelname})[1:-1]
+
+
+def _dumps_with_prefix(record: logging.LogRecord, log_entry: Dict[str, Any], default) -> str:
+    """序列化 log_entry，并把缓存的 name/levelname 片段拼接到对象开头"""
+    body = orjson.dumps(log_entry, default=default, option=_ORJSON_OPTIONS)
+    prefix = _name_level_prefix(record.name, record.levelname)
+    return (b"{" + prefix + b"," + body[1:]).decode('utf-8')
 
 
 class StructuredLogFormatter(logging.Formatter):
@@ -40,21 +88,23 @@ class StructuredLogFormatter(logging.Formatter):
         """
         格式化日志记录为 JSON 格式
         """
+        record_dict = record.__dict__
+        
         # 基础日志字段
         log_entry: Dict[str, Any] = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "timestamp": _format_timestamp(record.created),
             "message": record.getMessage(),
-            "name": record.name,
-            "levelname": record.levelname,
         }
         
         # 添加请求ID (如果有)
-        if hasattr(record, 'request_id'):
-            log_entry["request_id"] = record.request_id
+        request_id = record_dict.get('request_id')
+        if request_id is not None:
+            log_entry["request_id"] = request_id
         
         # 添加执行耗时 (如果有)
-        if hasattr(record, 'duration'):
-            log_entry["duration"] = record.duration
+        duration = record_dict.get('duration')
+        if duration is not None:
+            log_entry["duration"] = duration
         
         # 添加文件名和行号 (DEBUG级别)
         if record.levelno == logging.DEBUG:
@@ -69,25 +119,15 @@ class StructuredLogFormatter(logging.Formatter):
         if record.stack_info:
             log_entry["stack_info"] = self.formatStack(record.stack_info)
         
-        # 添加额外的字段
-        for key, value in record.__dict__.items():
-            if key not in {
-                'args', 'asctime', 'created', 'exc_info', 'exc_text', 'filename',
-                'funcName', 'levelname', 'levelno', 'lineno', 'module', 'msecs',
-                'message', 'msg', 'name', 'pathname', 'process', 'processName',
-                'relativeCreated', 'stack_info', 'thread', 'threadName',
-                'request_id', 'duration'
-            }:
+        # 添加额外的字段（按记录属性的插入顺序，输出中字段顺序稳定）
+        reserved = _RESERVED_RECORD_ATTRS
+        for key, value in record_dict.items():
+            if key not in reserved:
                 log_entry[key] = value
         
-        # 转换为 JSON 字符串
+        # 转换为 JSON 字符串（orjson 输出紧凑的 UTF-8，name/levelname 使用缓存片段）
         try:
-            return json.dumps(
-                log_entry,
-                ensure_ascii=self.ensure_ascii,
-                separators=(',', ':'),  # 紧凑格式，节省空间
-                default=self._json_serializer
-            )
+            return _dumps_with_prefix(record, log_entry, self._json_serializer)
         except (TypeError, ValueError) as e:
             # 如果序列化失败，回退到简单格式
             fallback_entry = {
@@ -113,47 +153,66 @@ class StructuredLogFormatter(logging.Formatter):
             return str(obj)
 
 
+@lru_cache(maxsize=16)
+def _compile_access_builder(fields: Tuple[str, ...]):
+    """
+    为给定的 HTTP 字段组合生成专用的访问日志字典构建函数
+    
+    字段组合在部署时即已确定，生成的代码只包含启用字段的读取，
+    没有逐字段的循环；相同组合只编译一次。
+    """
+    lines = [
+        "def _build(record, rd):",
+        "    log_entry = {",
+        "        'timestamp': _format_timestamp(record.created),",
+        "        'message': record.getMessage(),",
+        "        'request_id': rd.get('request_id') or 'N/A',",
+        "    }",
+        "    v = rd.get('duration')",
+        "    if v is not None:",
+        "        log_entry['duration'] = {'ms': v}",
+    ]
+    for field in fields:
+        lines.append(f"    v = rd.get({field!r})")
+        lines.append("    if v is not None:")
+        lines.append(f"        log_entry[{field!r}] = v")
+    lines.append("    return log_entry")
+    
+    namespace: Dict[str, Any] = {"_format_timestamp": _format_timestamp}
+    exec(compile("\n".join(lines), "<access_log_builder>", "exec"), namespace)
+    return namespace["_build"]
+
+
 class AccessLogFormatter(StructuredLogFormatter):
     """
     访问日志格式化器
     
-    专门用于 HTTP 请求访问日志，包含性能监控信息
+    专门用于 HTTP 请求访问日志，包含性能监控信息。
+    enabled_fields 指定输出的 HTTP 字段（可在 dictConfig 中配置），
+    初始化时据此生成专用的构建函数。
     """
     
+    def __init__(
+        self,
+        fmt: Optional[str] = None,
+        datefmt: Optional[str] = None,
+        style: str = '%',
+        validate: bool = True,
+        ensure_ascii: bool = False,
+        enabled_fields: Sequence[str] = _HTTP_ATTRS
+    ):
+        super().__init__(fmt, datefmt, style, validate, ensure_ascii)
+        self._build_entry = _compile_access_builder(tuple(enabled_fields))
+    
     def format(self, record: logging.LogRecord) -> str:
         """
         格式化访问日志记录
         """
-        log_entry: Dict[str, Any] = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
-            "message": record.getMessage(),
-            "name": record.name,
-            "levelname": record.levelname,
-        }
-        
-        # 访问日志特有字段
-        if hasattr(record, 'request_id'):
-            log_entry["request_id"] = record.request_id
-        else:
-            log_entry["request_id"] = "N/A"
-        
-        # 执行耗时
-        if hasattr(record, 'duration'):
-            log_entry["duration"] = {"ms": record.duration}
-        
-        # HTTP 相关字段
-        for attr in ['method', 'url', 'status_code', 'user_agent', 'ip_address']:
-            if hasattr(record, attr):
-                log_entry[attr] = getattr(record, attr)
+        log_entry = self._build_entry(record, record.__dict__)
         
         # 转换为 JSON 字符串
         try:
-            return json.dumps(
-                log_entry,
-                ensure_ascii=self.ensure_ascii,
-                separators=(',', ':'),
-                default=self._json_serializer
-            )
+            return _dumps_with_prefix(record, log_entry, self._json_serializer)
         except (TypeError, ValueError) as e:
             fallback_entry = {
                 "timestamp": log_entry["timestamp"],
@@ -164,5 +223,100 @@ class AccessLogFormatter(StructuredLogFormatter):
             return json.dumps(fallback_entry, ensure_ascii=self.ensure_ascii)
 
 
+class BufferedJSONHandler(logging.Handler):
+    """
+    批量写入的日志处理器
+    
+    emit 只负责格式化并把编码后的日志行放入队列；后台线程把日志行累积到
+    缓冲区，在缓冲区达到 max_buffer 字节或最早一条日志等待超过
+    flush_interval 秒时，用一次 os.write 写出，把每条日志一次系统调用
+    合并为每批一次。配合上面的 JSON 格式化器使用，例如：
+    
+        handlers:
+          buffered_file:
+            class: src.genesis.core.structured_logging.BufferedJSONHandler
+            formatter: structured
+            filename: logs/app.log
+    
+    不负责日志轮转。未指定 filename 时写入 fd（默认标准输出）。
+    """
+    
+    _STOP = object()
+    
+    def __init__(
+        self,
+        filename: Optional[str] = None,
+        fd: int = 1,
+        flush_interval: float = 0.05,
+        max_buffer: int = 128 * 1024,
+        level: int = logging.NOTSET
+    ):
+        super().__init__(level)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._owns_fd = filename is not None
+        if filename is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            fd = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._fd = fd
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="buffered-json-handler", daemon=True
+        )
+        self._thread.start()
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._queue.put_nowait(self.format(record).encode('utf-8') + b'\n')
+        except Exception:
+            self.handleError(record)
+    
+    def _run(self):
+        log_queue = self._queue
+        buf = bytearray()
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if buf else None
+            try:
+                item = log_queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(buf)
+                continue
+            if item is self._STOP:
+                self._write(buf)
+                return
+            if not buf:
+                deadline = time.monotonic() + self.flush_interval
+            buf += item
+            if len(buf) >= self.max_buffer:
+                self._write(buf)
+    
+    def _write(self, buf: bytearray):
+        view = memoryview(buf)
+        try:
+            while view:
+                view = view[os.write(self._fd, view):]
+        except OSError:
+            # 与 logging.Handler.handleError 一样报告到 stderr，而不是静默丢弃整批日志
+            if logging.raiseExceptions and sys.stderr:
+                sys.stderr.write(
+                    f"--- Logging error ---\n"
+                    f"BufferedJSONHandler 写入失败，丢弃 {len(view)} 字节日志\n"
+                )
+                traceback.print_exc(file=sys.stderr)
+        finally:
+            view.release()
+            buf.clear()
+    
+    def close(self):
+        """写出缓冲区中剩余的日志并停止后台线程"""
+        if self._thread.is_alive():
+            self._queue.put_nowait(self._STOP)
+            self._thread.join()
+            if self._owns_fd:
+                os.close(self._fd)
+        super().close()
+
+
 # 导出格式化器类
-__all__ = ['StructuredLogFormatter', 'AccessLogFormatter']
\ No newline at end of file
+__all__ = ['StructuredLogFormatter', 'AccessLogFormatter', 'BufferedJSONHandler']
\ No newline at end of file
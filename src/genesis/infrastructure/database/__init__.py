@@ -14,12 +14,16 @@ from .manager import (
     Base,
     DatabaseManager,
     get_db_manager,
+    get_db_manager_async,
     initialize_db,
     close_db,
     get_db_session,
+    get_readonly_db_session,
     get_db_transaction,
 )
 
+from .bulk_writer import BulkLogWriter
+
 from .models import (
     UserSession,
     UserBehavior,
@@ -37,10 +41,13 @@ __all__ = [
     "Base",
     "DatabaseManager",
     "get_db_manager", 
+    "get_db_manager_async",
     "initialize_db",
     "close_db",
     "get_db_session",
+    "get_readonly_db_session",
     "get_db_transaction",
+    "BulkLogWriter",
     # 数据模型
     "UserSession",
     "UserBehavior",
@@ -0,0 +1,109 @@
+"""
+Genesis AI 应用批量日志写入模块
+==============================
+
+为 APILog、LLMCall、PerformanceMetric 等只追加写入的日志表提供批量写入：
+调用方只把行数据放入缓冲区，后台任务按数量或时间阈值把整批数据合并为
+一次多行 INSERT 和一次 COMMIT 写入数据库。
+
+使用示例：
+    writer = BulkLogWriter(APILog)
+    await writer.start()
+    writer.add({"request_id": ..., "method": "GET", ...})
+    ...
+    await writer.stop()
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.genesis.infrastructure.database.manager import DatabaseManager, get_db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class BulkLogWriter:
+    """
+    日志表批量写入器
+
+    缓冲区达到 flush_size 行或距上次写入超过 flush_interval_ms 毫秒时写入一批。
+    add 必须在事件循环所在线程中调用。
+    """
+
+    def __init__(
+        self,
+        model: type,
+        flush_size: int = 500,
+        flush_interval_ms: int = 100,
+        db_manager: Optional[DatabaseManager] = None,
+    ):
+        """
+        Args:
+            model: 目标数据表模型
+            flush_size: 触发立即写入的缓冲行数
+            flush_interval_ms: 定时写入间隔（毫秒）
+            db_manager: 数据库管理器，默认使用全局实例
+        """
+        self.model = model
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._db_manager = db_manager
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_event = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, row: Dict[str, Any]):
+        """把一行数据（列名 -> 值）放入缓冲区"""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.flush_size:
+            self._flush_event.set()
+
+    async def start(self):
+        """启动后台写入任务"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台写入任务，并写入缓冲区中剩余的数据"""
+        if self._task is not None:
+            # 不取消任务：取消会打断正在进行的写入，已从缓冲区取出的整批数据随之丢失。
+            # 改为通知后台循环退出，并等待它完成当前这一批
+            self._stopping = True
+            self._flush_event.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        """把当前缓冲区作为一批写入数据库"""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+
+        db_manager = self._db_manager or get_db_manager()
+        try:
+            async with db_manager.session() as session:
+                # executemany 形式由 SQLAlchemy 合并为多行 INSERT
+                await session.execute(pg_insert(self.model), batch)
+                await session.commit()
+        except Exception:
+            logger.exception(
+                "批量写入 %s 失败，丢弃 %d 行数据", self.model.__tablename__, len(batch)
+            )
+
+
+__all__ = ["BulkLogWriter"]
@@ -12,9 +12,12 @@ Genesis AI 应用数据库连接池管理模块
 """
 
 import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Iterable, Optional, Sequence
 
+import orjson
 from sqlalchemy.ext.asyncio import (
     AsyncEngine, 
     AsyncSession, 
@@ -26,6 +29,21 @@ from sqlalchemy import text
 
 from src.genesis.core.settings import DatabaseConfig
 
+logger = logging.getLogger(__name__)
+
+# asyncpg 连接参数：放大 asyncpg 和 SQLAlchemy 两层的预编译语句缓存，
+# 关闭对短 OLTP 查询无益的 JIT 编译
+_ASYNCPG_CONNECT_ARGS = {
+    "statement_cache_size": 1024,
+    "prepared_statement_cache_size": 1024,
+    "server_settings": {"jit": "off"},
+}
+
+
+def _orjson_serializer(obj) -> str:
+    """JSON/JSONB 列的序列化函数"""
+    return orjson.dumps(obj).decode()
+
 
 class Base(DeclarativeBase):
     """
@@ -48,6 +66,16 @@ class DatabaseManager:
     - 处理连接池的健康检查
     """
     
+    # get_pool_status 返回的字段，按固定顺序预先构建模板字典
+    _POOL_KEYS = (
+        "status", "pool_size", "pool_timeout", "max_overflow",
+        "current_overflow", "checked_in", "checked_out",
+    )
+    _POOL_STATUS_TEMPLATE = dict.fromkeys(_POOL_KEYS)
+    
+    # 健康检查结果的缓存时间（秒）
+    HEALTH_CHECK_TTL = 0.5
+    
     def __init__(self, config: DatabaseConfig):
         """
         初始化数据库管理器
@@ -58,7 +86,10 @@ class DatabaseManager:
         self.config = config
         self._engine: Optional[AsyncEngine] = None
         self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._readonly_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
         self._initialized = False
+        # 最近一次健康检查的 (time.monotonic() 时间, 结果)
+        self._last_health = (float("-inf"), False)
     
     async def initialize(self):
         """初始化数据库连接池"""
@@ -74,6 +105,11 @@ class DatabaseManager:
                 pool_timeout=self.config.pool_timeout,
                 pool_recycle=self.config.pool_recycle,
                 echo=self.config.echo,
+                pool_pre_ping=True,  # 取出连接时检测已断开的连接并自动重连
+                connect_args=_ASYNCPG_CONNECT_ARGS,
+                # JSON/JSONB 列使用 orjson 编解码（JSONB 由方言以二进制格式传输）
+                json_serializer=_orjson_serializer,
+                json_deserializer=orjson.loads,
                 future=True,  # 使用 SQLAlchemy 2.0 风格
             )
             
@@ -85,15 +121,56 @@ class DatabaseManager:
                 autoflush=False,
             )
             
+            # 只读会话工厂：AUTOCOMMIT 模式下不发送 BEGIN/COMMIT，每条查询少一次往返
+            self._readonly_session_factory = async_sessionmaker(
+                bind=self._engine.execution_options(isolation_level="AUTOCOMMIT"),
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False,
+            )
+            
             # 测试连接
             async with self._engine.begin() as conn:
                 await conn.execute(text("SELECT 1"))
             
+            # 预热连接池，避免首批请求承担建立连接的开销
+            await self._prewarm_pool()
+            
             self._initialized = True
             
         except Exception as e:
             raise RuntimeError(f"数据库连接池初始化失败: {e}") from e
     
+    async def _prewarm_pool(self):
+        """并发建立 pool_size 个连接后立即归还，使连接池在启动时即被填满"""
+        pool_size = self.config.pool_size
+        max_overflow = self.config.max_overflow
+        if max_overflow > pool_size * 2:
+            logger.warning(
+                "数据库连接池 max_overflow (%d) 远大于 pool_size (%d)，"
+                "高峰期将频繁创建和销毁溢出连接，建议调大 pool_size",
+                max_overflow, pool_size,
+            )
+        if pool_size <= 0:
+            return
+        
+        # 预热只是优化：单个连接失败时仍归还已建立的连接，且不中断初始化
+        results = await asyncio.gather(
+            *(self._engine.connect() for _ in range(pool_size)),
+            return_exceptions=True,
+        )
+        connections = [r for r in results if not isinstance(r, BaseException)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        await asyncio.gather(
+            *(conn.close() for conn in connections), return_exceptions=True
+        )
+        if errors:
+            logger.warning(
+                "数据库连接池预热时 %d/%d 个连接建立失败: %s",
+                len(errors), pool_size, errors[0],
+            )
+        logger.info("数据库连接池已预热 %d 个连接", len(connections))
+    
     async def close(self):
         """关闭数据库连接池"""
         if not self._initialized:
@@ -105,11 +182,12 @@ class DatabaseManager:
                 self._engine = None
             
             self._session_factory = None
+            self._readonly_session_factory = None
             self._initialized = False
             
-        except Exception as e:
+        except Exception:
             # 记录错误但不抛出异常，确保应用能正常关闭
-            print(f"关闭数据库连接池时发生错误: {e}")
+            logger.exception("关闭数据库连接池时发生错误")
     
     @property
     def engine(self) -> AsyncEngine:
@@ -146,6 +224,23 @@ class DatabaseManager:
             finally:
                 await session.close()
     
+    @asynccontextmanager
+    async def readonly_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        获取只读数据库会话的上下文管理器
+        
+        连接处于 AUTOCOMMIT 模式，不会开启事务，只应用于执行 SELECT 查询。
+        
+        使用示例：
+            async with db_manager.readonly_session() as session:
+                result = await session.execute(query)
+        """
+        if not self._initialized:
+            raise RuntimeError("数据库管理器未初始化")
+        
+        async with self._readonly_session_factory() as session:
+            yield session
+    
     @asynccontextmanager
     async def transaction(self) -> AsyncGenerator[AsyncSession, None]:
         """
@@ -165,17 +260,60 @@ class DatabaseManager:
                 await session.rollback()
                 raise
     
+    async def copy_metrics(self, rows: Iterable[Sequence[Any]]) -> int:
+        """
+        使用 PostgreSQL COPY 批量写入性能指标
+        
+        绕过 ORM 和 INSERT 语句，通过 asyncpg 的二进制 COPY 协议直接导入
+        performance_metrics 表，适合高频的时序数据写入。
+        
+        Args:
+            rows: (metric_name, metric_value, tags, timestamp) 元组序列，
+                  tags 为字典或 None
+        
+        Returns:
+            int: 写入的行数
+        """
+        # SQLAlchemy 为 JSONB 注册的编解码器接收字符串，这里先把 tags 序列化
+        records = [
+            (name, value, _orjson_serializer(tags) if tags is not None else None, timestamp)
+            for name, value, tags, timestamp in rows
+        ]
+        if not records:
+            return 0
+        
+        async with self.engine.connect() as conn:
+            raw_connection = await conn.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                "performance_metrics",
+                records=records,
+                columns=["metric_name", "metric_value", "tags", "timestamp"],
+            )
+        return len(records)
+    
     async def health_check(self) -> bool:
-        """数据库健康检查"""
+        """
+        数据库健康检查
+        
+        结果缓存 HEALTH_CHECK_TTL 秒，高频探针不会每次都占用连接执行 SELECT 1；
+        故障最多延迟一个缓存周期才被发现。
+        """
         if not self._initialized:
             return False
         
+        checked_at, healthy = self._last_health
+        now = time.monotonic()
+        if now - checked_at < self.HEALTH_CHECK_TTL:
+            return healthy
+        
         try:
             async with self._engine.begin() as conn:
                 await conn.execute(text("SELECT 1"))
-            return True
+            healthy = True
         except Exception:
-            return False
+            healthy = False
+        self._last_health = (now, healthy)
+        return healthy
     
     def get_pool_status(self) -> dict:
         """获取连接池状态信息"""
@@ -183,29 +321,34 @@ class DatabaseManager:
             return {"status": "not_initialized"}
         
         pool = self._engine.pool
-        return {
-            "status": "initialized",
-            "pool_size": pool.size(),
-            "pool_timeout": pool.timeout(),
-            "max_overflow": pool._max_overflow,
-            "current_overflow": pool._overflow,
-            "checked_in": pool.checkedin(),
-            "checked_out": pool.checkedout(),
-        }
+        # 复制已预分配好容量的模板，再逐项填入当前值
+        status = self._POOL_STATUS_TEMPLATE.copy()
+        status["status"] = "initialized"
+        status["pool_size"] = pool.size()
+        status["pool_timeout"] = pool.timeout()
+        status["max_overflow"] = pool._max_overflow
+        status["current_overflow"] = pool._overflow
+        status["checked_in"] = pool.checkedin()
+        status["checked_out"] = pool.checkedout()
+        return status
 
 
 # 全局数据库管理器实例
 _db_manager: Optional[DatabaseManager] = None
 
 
-async def get_db_manager() -> DatabaseManager:
+def get_db_manager() -> DatabaseManager:
     """获取全局数据库管理器实例"""
-    global _db_manager
     if _db_manager is None:
         raise RuntimeError("数据库管理器未初始化，请先调用 initialize_db")
     return _db_manager
 
 
+async def get_db_manager_async() -> DatabaseManager:
+    """get_db_manager 的异步版本，兼容原先 `await get_db_manager()` 的调用方式"""
+    return get_db_manager()
+
+
 async def initialize_db(config: DatabaseConfig) -> DatabaseManager:
     """
     初始化全局数据库管理器
@@ -233,7 +376,7 @@ async def close_db():
         _db_manager = None
 
 
-async def get_db_session() -> AsyncSession:
+async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """
     获取数据库会话的依赖注入函数
     
@@ -241,15 +384,26 @@ async def get_db_session() -> AsyncSession:
         @app.get("/users")
         async def get_users(session: AsyncSession = Depends(get_db_session)):
             pass
+    
+    会话在请求结束后由 FastAPI 关闭生成器时自动释放。
+    """
+    db_manager = get_db_manager()
+    async with db_manager.session() as session:
+        yield session
+
+
+async def get_readonly_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取只读数据库会话的依赖注入函数
+    
+    用于只执行查询的路由，省去每个请求的 BEGIN/COMMIT：
+        @app.get("/users")
+        async def get_users(session: AsyncSession = Depends(get_readonly_db_session)):
+            pass
     """
-    db_manager = await get_db_manager()
-    session_context = db_manager.session()
-    session = await session_context.__aenter__()
-    # Store the context manager for cleanup
-    if not hasattr(get_db_session, '_session_contexts'):
-        get_db_session._session_contexts = {}
-    get_db_session._session_contexts[id(session)] = session_context
-    return session
+    db_manager = get_db_manager()
+    async with db_manager.readonly_session() as session:
+        yield session
 
 
 @asynccontextmanager
@@ -265,7 +419,7 @@ async def get_db_transaction() -> AsyncGenerator[AsyncSession, None]:
         ):
             pass
     """
-    db_manager = await get_db_manager()
+    db_manager = get_db_manager()
     async with db_manager.transaction() as session:
         yield session
 
@@ -275,8 +429,10 @@ __all__ = [
     "Base",
     "DatabaseManager", 
     "get_db_manager",
+    "get_db_manager_async",
     "initialize_db",
     "close_db",
     "get_db_session",
+    "get_readonly_db_session",
     "get_db_transaction",
 ]
\ No newline at end of file
@@ -13,12 +13,27 @@ Genesis AI 应用数据库模型
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, func, Boolean, DECIMAL
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, Identity, Integer, String, Text, DateTime, Float, func, Boolean, DECIMAL, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 from src.genesis.infrastructure.database.manager import Base
 
 
+def deferred_index(name: str, *expressions, **kw) -> Index:
+    """
+    声明查询优化索引。
+
+    create_all 照常创建这些索引；scripts/initialize_complete.py 建表时跳过它们，
+    在数据写入之后再统一创建。
+    """
+    return Index(name, *expressions, info={"deferred": True}, **kw)
+
+
+def is_deferred_index(index: Index) -> bool:
+    """是否为 deferred_index 声明的索引"""
+    return bool(index.info.get("deferred"))
+
+
 class User(Base):
     """
     用户数据模型，对应 'users' 表。
@@ -58,7 +73,7 @@ class UserSession(Base):
     
     # 用户画像信息
     user_segment = Column(String(100), nullable=True)  # 用户分群
-    preferences = Column(JSON, nullable=True)  # 用户偏好设置
+    preferences = Column(JSONB, nullable=True)  # 用户偏好设置
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
@@ -77,13 +92,14 @@ class UserBehavior(Base):
 
     __tablename__ = "user_behaviors"
 
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), index=True, nullable=False)
-    user_id = Column(String(255), index=True, nullable=False)
+    # 高写入量表：BIGINT 主键避免溢出，序列每个会话预取 1000 个值
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
+    session_id = Column(String(255), nullable=False)
+    user_id = Column(String(255), nullable=False)
     
     # 行为类型和内容
     behavior_type = Column(String(50), nullable=False)  # 'view', 'search', 'click', 'purchase'
-    behavior_data = Column(JSON, nullable=False)  # 行为的具体数据
+    behavior_data = Column(JSONB, nullable=False)  # 行为的具体数据
     
     # 意图分析结果
     detected_intent = Column(String(255), nullable=True)
@@ -91,6 +107,11 @@ class UserBehavior(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_user_behaviors_session_created", session_id, created_at.desc()),
+        deferred_index("ix_user_behaviors_user_session_created", user_id, session_id, created_at),
+    )
+
     def __repr__(self):
         return f"<UserBehavior(id={self.id}, session_id='{self.session_id}', type='{self.behavior_type}')>"
 
@@ -104,12 +125,12 @@ class IntentAnalysis(Base):
     __tablename__ = "intent_analyses"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), index=True, nullable=False)
-    user_id = Column(String(255), index=True, nullable=False)
+    session_id = Column(String(255), nullable=False)
+    user_id = Column(String(255), nullable=False)
     
     # 意图分析结果
     primary_intent = Column(String(255), nullable=False)
-    secondary_intents = Column(JSON, nullable=True)  # 次要意图列表
+    secondary_intents = Column(JSONB, nullable=True)  # 次要意图列表
     target_audience_segment = Column(String(100), nullable=False)
     urgency_level = Column(Float, nullable=False)  # 0.0 到 1.0
     
@@ -119,6 +140,11 @@ class IntentAnalysis(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_intent_analyses_session_created", session_id, created_at.desc()),
+        deferred_index("ix_intent_analyses_user_created", user_id, created_at.desc()),
+    )
+
     def __repr__(self):
         return f"<IntentAnalysis(id={self.id}, session_id='{self.session_id}', intent='{self.primary_intent}')>"
 
@@ -132,8 +158,8 @@ class AdRecommendation(Base):
     __tablename__ = "ad_recommendations"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), index=True, nullable=False)
-    user_id = Column(String(255), index=True, nullable=False)
+    session_id = Column(String(255), nullable=False)
+    user_id = Column(String(255), nullable=False)
     analysis_id = Column(Integer, nullable=True)  # 关联的意图分析ID
     
     # 推荐内容
@@ -148,6 +174,11 @@ class AdRecommendation(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_ad_recommendations_session_created", session_id, created_at.desc()),
+        deferred_index("ix_ad_recommendations_user_created", user_id, created_at.desc()),
+    )
+
     def __repr__(self):
         return f"<AdRecommendation(id={self.id}, ad_id='{self.ad_id}', score={self.relevance_score})>"
 
@@ -182,11 +213,22 @@ class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), index=True, nullable=False)
+    session_id = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False)  # 'user', 'assistant', 'tool', 'system'
     content = Column(Text, nullable=False)  # JSON格式的消息内容
+    # 消息内容是否带 tool_calls，写入时填充，读取历史判断工具调用链时无需解析 content
+    has_tool_calls = Column(Boolean, nullable=False, default=False, server_default=text("false"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # 与 SessionService.get_history 的 WHERE + ORDER BY 完全匹配，
+        # 取最近 N 条消息只需一次索引范围扫描，无需排序
+        deferred_index(
+            "ix_chat_messages_session_created",
+            session_id, created_at.desc(), id.desc(),
+        ),
+    )
+
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, session_id='{self.session_id}', role='{self.role}')>"
 
@@ -221,9 +263,9 @@ class LLMCall(Base):
 
     __tablename__ = "llm_calls"
 
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(255), index=True, nullable=True)
-    user_id = Column(String(255), index=True, nullable=True)
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
+    session_id = Column(String(255), nullable=True)
+    user_id = Column(String(255), nullable=True)
     
     # 调用信息
     provider = Column(String(50), nullable=False)  # 'openai', 'qwen', etc.
@@ -231,8 +273,8 @@ class LLMCall(Base):
     endpoint = Column(String(100), nullable=False)
     
     # 请求和响应
-    request_data = Column(JSON, nullable=False)
-    response_data = Column(JSON, nullable=True)
+    request_data = Column(JSONB, nullable=False)
+    response_data = Column(JSONB, nullable=True)
     tokens_used = Column(Integer, nullable=True)
     cost_usd = Column(Float, nullable=True)
     
@@ -243,6 +285,14 @@ class LLMCall(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_llm_calls_session_created", session_id, created_at.desc()),
+        deferred_index("ix_llm_calls_user_created", user_id, created_at.desc()),
+        deferred_index("idx_llm_calls_provider_model_status", provider, model, status_code),
+        # 只追加写入的时间列使用 BRIN，体积远小于 B-tree
+        deferred_index("brin_llm_calls_created", created_at, postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
+
     def __repr__(self):
         return f"<LLMCall(id={self.id}, provider='{self.provider}', model='{self.model}', status={self.status_code})>"
 
@@ -255,7 +305,7 @@ class APILog(Base):
 
     __tablename__ = "api_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     request_id = Column(String(255), index=True, nullable=False)
     session_id = Column(String(255), index=True, nullable=True)
     user_id = Column(String(255), index=True, nullable=True)
@@ -263,8 +313,8 @@ class APILog(Base):
     # 请求信息
     method = Column(String(10), nullable=False)
     path = Column(String(500), nullable=False)
-    query_params = Column(JSON, nullable=True)
-    headers = Column(JSON, nullable=True)
+    query_params = Column(JSONB, nullable=True)
+    headers = Column(JSONB, nullable=True)
     body = Column(Text, nullable=True)
     
     # 响应信息
@@ -278,6 +328,21 @@ class APILog(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_api_logs_method_status", method, status_code),
+        # 只索引错误请求，按时间查询最近的错误
+        deferred_index(
+            "ix_api_logs_status_created", status_code, created_at,
+            postgresql_where=text("status_code >= 400"),
+        ),
+        deferred_index("brin_api_logs_created", created_at, postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+        # 支持按请求头做包含查询（headers @> '{...}'）
+        deferred_index(
+            "ix_api_logs_headers_gin", headers,
+            postgresql_using="gin", postgresql_ops={"headers": "jsonb_path_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<APILog(id={self.id}, method='{self.method}', path='{self.path}', status={self.status_code})>"
 
@@ -293,8 +358,8 @@ class ToolCall(Base):
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(255), index=True, nullable=True)
     tool_name = Column(String(100), nullable=False)
-    tool_args = Column(JSON, nullable=True)
-    result = Column(JSON, nullable=True)
+    tool_args = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
     duration_ms = Column(Integer, nullable=True)
     status = Column(String(20), nullable=False)  # 'success', 'error'
     error_message = Column(Text, nullable=True)
@@ -312,12 +377,17 @@ class PerformanceMetric(Base):
 
     __tablename__ = "performance_metrics"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     metric_name = Column(String(100), nullable=False)
     metric_value = Column(DECIMAL(15, 6), nullable=False)
-    tags = Column(JSON, nullable=True)
+    tags = Column(JSONB, nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_performance_metrics_name_timestamp", metric_name, timestamp.desc()),
+        deferred_index("brin_performance_metrics_timestamp", timestamp, postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
+
     def __repr__(self):
         return f"<PerformanceMetric(id={self.id}, name='{self.metric_name}', value={self.metric_value})>"
 
@@ -330,14 +400,19 @@ class ErrorLog(Base):
 
     __tablename__ = "error_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     error_type = Column(String(100), nullable=False)
     error_message = Column(Text, nullable=False)
     stack_trace = Column(Text, nullable=True)
     request_id = Column(String(100), nullable=True)
-    context = Column(JSON, nullable=True)
+    context = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        deferred_index("idx_error_logs_type_created", error_type, created_at.desc()),
+        deferred_index("brin_error_logs_created", created_at, postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
+
     def __repr__(self):
         return f"<ErrorLog(id={self.id}, type='{self.error_type}', message='{self.error_message[:50]}...')>"
 
@@ -350,12 +425,12 @@ class AuditLog(Base):
 
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     action = Column(String(100), nullable=False)
     resource_type = Column(String(50), nullable=False)
     resource_id = Column(String(255), nullable=True)
     user_id = Column(String(255), nullable=True)
-    changes = Column(JSON, nullable=True)
+    changes = Column(JSONB, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
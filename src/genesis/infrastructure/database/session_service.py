@@ -10,25 +10,66 @@ Genesis AI 应用数据库会话服务
 参考 py-ai-core 项目的实现，针对当前项目优化。
 """
 
+import asyncio
 import logging
-import json
-from typing import List, Dict, Any, Optional
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc
+from sqlalchemy import Row, delete, desc, insert, tuple_
 
 from src.genesis.infrastructure.database.models import ChatMessage, ChatSession
-from src.genesis.core.settings import settings
+from src.genesis.core.settings import get_frozen_settings
 
 logger = logging.getLogger(__name__)
 
+# 会话系统提示词的进程内缓存有效期（秒）
+PROMPT_CACHE_TTL = 60.0
+
+# 提示词缓存最多保留的会话数，超出时淘汰最早写入的条目
+PROMPT_CACHE_MAX_SIZE = 10000
+
+# 查库加锁使用的固定锁数量：会话按 hash(session_id) 分配到其中一把锁
+PROMPT_LOCK_STRIPES = 64
+
+# 获取历史时在窗口大小之外多取的消息数，用于补全被截断的工具调用链
+CHAIN_SLACK = 8
+
+# 消息内容编码选项：与原先的 json.dumps 一样接受非字符串键（如工具参数中的整数键）
+_CONTENT_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _safe_loads(msg: Row) -> Dict[str, Any]:
+    """解析消息的 JSON 内容，失败时退化为 role/content 字典"""
+    try:
+        message_dict = orjson.loads(msg.content)
+    except (ValueError, TypeError):
+        message_dict = None
+    if not isinstance(message_dict, dict):
+        logger.warning("解析历史消息 content 失败，消息ID: %s", msg.id)
+        return {"role": msg.role, "content": msg.content}
+    return message_dict
+
+
+def _in_tool_chain(msg: Row) -> bool:
+    """消息是否属于工具调用链：tool 消息，或带 tool_calls 的 assistant 消息（只读 role/has_tool_calls 列）"""
+    return msg.role == "tool" or (msg.role == "assistant" and msg.has_tool_calls)
+
 
 class SessionService:
     """数据库会话服务"""
     
     def __init__(self):
         """初始化会话服务"""
+        # session_id -> (写入时间, 数据库中的 system_prompt)，按写入时间先后排列
+        self._prompt_cache: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._prompt_locks: List[asyncio.Lock] = [
+            asyncio.Lock() for _ in range(PROMPT_LOCK_STRIPES)
+        ]
         logger.info("数据库会话服务 (SessionService) 已初始化。")
 
     async def get_or_create_session(
@@ -43,7 +84,7 @@ class SessionService:
             logger.info("会话 '%s' 不存在，正在创建新会话...", session_id)
             session = ChatSession(
                 session_id=session_id, 
-                system_prompt=settings.llm.default_system_prompt
+                system_prompt=get_frozen_settings().llm.default_system_prompt
             )
             db.add(session)
             await db.commit()
@@ -56,7 +97,39 @@ class SessionService:
     ) -> str:
         """
         获取会话的系统提示词。如果请求中提供了新的提示词，则更新会话。
+        提示词在进程内缓存 PROMPT_CACHE_TTL 秒，请求的提示词与缓存不一致时重新查库。
         """
+        system_prompt = self._cached_prompt(session_id, requested_prompt)
+        if system_prompt is None:
+            # 同一会话的并发请求只让一个去查库，其余等待后直接命中缓存（不同会话可能共用同一把锁）
+            async with self._prompt_locks[hash(session_id) % PROMPT_LOCK_STRIPES]:
+                system_prompt = self._cached_prompt(session_id, requested_prompt)
+                if system_prompt is None:
+                    system_prompt = await self._load_session_prompt(
+                        session_id, db, requested_prompt
+                    )
+
+        return system_prompt or get_frozen_settings().llm.default_system_prompt
+
+    def _cached_prompt(
+        self, session_id: str, requested_prompt: Optional[str]
+    ) -> Optional[str]:
+        """返回仍然有效的缓存提示词；未命中、过期或需要更新时返回 None"""
+        cached = self._prompt_cache.get(session_id)
+        if cached is None:
+            return None
+        cached_at, system_prompt = cached
+        if time.monotonic() - cached_at >= PROMPT_CACHE_TTL:
+            return None
+        if requested_prompt and system_prompt != requested_prompt:
+            return None
+        return system_prompt or get_frozen_settings().llm.default_system_prompt
+
+    async def _load_session_prompt(
+        self, session_id: str, db: AsyncSession, requested_prompt: Optional[str]
+    ) -> Optional[str]:
+        """从数据库读取（必要时更新）会话提示词，并写入缓存"""
+        self._prompt_cache.pop(session_id, None)
         session = await self.get_or_create_session(session_id, db)
 
         if requested_prompt and session.system_prompt != requested_prompt:
@@ -66,7 +139,48 @@ class SessionService:
             await db.refresh(session)
             logger.info("会话 '%s' 的系统提示词已更新。", session_id)
 
-        return session.system_prompt or settings.llm.default_system_prompt
+        self._store_prompt(session_id, session.system_prompt)
+        return session.system_prompt
+
+    def _store_prompt(self, session_id: str, system_prompt: Optional[str]):
+        """写入提示词缓存，先淘汰已过期的条目，再把缓存限制在 PROMPT_CACHE_MAX_SIZE 条以内"""
+        cache = self._prompt_cache
+        now = time.monotonic()
+        cache[session_id] = (now, system_prompt)
+        cache.move_to_end(session_id)
+
+        # 条目按写入时间排列，过期条目都在开头
+        while cache:
+            cached_at, _ = next(iter(cache.values()))
+            if now - cached_at < PROMPT_CACHE_TTL:
+                break
+            cache.popitem(last=False)
+        while len(cache) > PROMPT_CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+
+    async def _fetch_history_rows(
+        self, db: AsyncSession, session_id: str, limit: int, before: Optional[Row] = None
+    ) -> List[Row]:
+        """按时间倒序取会话消息；指定 before 时只取比该行更早的消息"""
+        # 只取用到的列，返回 Row 而不构造 ORM 对象；created_at 用作向前翻页的游标
+        query = select(
+            ChatMessage.id,
+            ChatMessage.role,
+            ChatMessage.content,
+            ChatMessage.has_tool_calls,
+            ChatMessage.created_at,
+        ).where(ChatMessage.session_id == session_id)
+        if before is not None:
+            query = query.where(
+                tuple_(ChatMessage.created_at, ChatMessage.id)
+                < tuple_(before.created_at, before.id)
+            )
+        query = query.order_by(
+            desc(ChatMessage.created_at), desc(ChatMessage.id)
+        ).limit(limit)
+
+        result = await db.execute(query)
+        return result.all()
 
     async def get_history(
         self, session_id: str, db: AsyncSession
@@ -79,81 +193,64 @@ class SessionService:
             return []
 
         logger.info("正在从数据库为会话 '%s' 获取历史记录 (智能截断)...", session_id)
+        max_history_messages = get_frozen_settings().llm.max_history_messages
+        if max_history_messages <= 0:
+            # 与 limit(0) 的查询结果一致：不携带任何历史消息
+            return []
 
-        # 1. 为了保证逻辑完整性，我们稍微多取一些数据，比如窗口大小的两倍
-        query = (
-            select(ChatMessage)
-            .where(ChatMessage.session_id == session_id)
-            .order_by(desc(ChatMessage.created_at), desc(ChatMessage.id))
-            .limit(settings.llm.max_history_messages * 2)  # 多取一些作为缓冲区
-        )
-
-        result = await db.execute(query)
+        # 1. 窗口大小之外只多取 CHAIN_SLACK 条作为缓冲区，足以覆盖常见的工具调用链
+        limit = max_history_messages + CHAIN_SLACK
         # 注意：这里是倒序的，最新的在最前面
-        recent_messages_desc = result.scalars().all()
+        recent_messages_desc = await self._fetch_history_rows(db, session_id, limit)
 
         if not recent_messages_desc:
             logger.info("会话 '%s' 在数据库中没有历史记录。", session_id)
             return []
 
+        messages_desc = list(recent_messages_desc)
+        # 取回的行数不足 limit，说明数据库中已没有更早的消息
+        exhausted = len(recent_messages_desc) < limit
+
         # 2. 从最新的消息开始，截取到我们配置的窗口大小
-        if len(recent_messages_desc) > settings.llm.max_history_messages:
-            truncated_desc = recent_messages_desc[:settings.llm.max_history_messages]
-        else:
-            truncated_desc = recent_messages_desc
+        final_len = min(len(messages_desc), max_history_messages)
 
         # 3. ✅✅✅ 智能截断的核心逻辑 ✅✅✅
         #    检查被截断后的"最老"一条消息（在倒序列表里是最后一条）
         #    如果它是一个 'tool' 或者是有 'tool_calls' 的 'assistant' 消息，
         #    说明一个完整的调用链被切断了，我们需要往前多取几条，直到找到这个链的起点。
-        final_messages_desc = list(truncated_desc)
-
-        # 从被截断的边缘开始往回看
-        oldest_message_in_window_index = len(truncated_desc) - 1
-
-        # 只要窗口的最老一条消息是工具调用链的一部分，就继续往前扩张窗口
-        while oldest_message_in_window_index < len(recent_messages_desc) - 1:
-            oldest_message_model = final_messages_desc[-1]
-            try:
-                # 解析消息内容来判断
-                content_dict = json.loads(oldest_message_model.content)
-                role = content_dict.get("role")
-                has_tool_calls = "tool_calls" in content_dict
-
-                # 如果最老的消息是 tool，或者是有 tool_calls 的 assistant，说明链条不完整
-                if role == "tool" or (role == "assistant" and has_tool_calls):
-                    logger.debug("发现不完整的工具调用链，正在向前扩展历史窗口...")
-                    # 从原始的、更长的历史记录中，把更早的一条消息加进来
-                    oldest_message_in_window_index += 1
-                    final_messages_desc.append(
-                        recent_messages_desc[oldest_message_in_window_index]
-                    )
-                else:
+        #    只要窗口的最老一条消息是工具调用链的一部分，就继续往前扩张窗口
+        while True:
+            while final_len < len(messages_desc):
+                if not _in_tool_chain(messages_desc[final_len - 1]):
                     # 如果最老的消息是 user 或者普通的 assistant 回答，说明链条是完整的，可以停止扩展
                     break
-            except (json.JSONDecodeError, AttributeError):
-                # 解析失败或格式不对，也视为一个完整的终点
-                break
+                logger.debug("发现不完整的工具调用链，正在向前扩展历史窗口...")
+                final_len += 1
+            else:
+                # 缓冲区已用完而调用链仍未闭合：再向前查询一批更早的消息
+                if not exhausted and _in_tool_chain(messages_desc[-1]):
+                    older = await self._fetch_history_rows(
+                        db, session_id, CHAIN_SLACK, before=messages_desc[-1]
+                    )
+                    exhausted = len(older) < CHAIN_SLACK
+                    if older:
+                        messages_desc.extend(older)
+                        continue
+            break
 
         # 4. 将最终确定的、倒序的消息列表，反转成正确的对话顺序
-        messages_in_correct_order = list(reversed(final_messages_desc))
+        #    只有最终窗口内的消息需要解析 JSON；负步长切片一次完成截取和反转。
+        #    messages_desc 非空且 max_history_messages >= 1，因此 final_len >= 1，
+        #    切片起点不会是 -1（那会取到整个列表）
+        history_dicts = [_safe_loads(msg) for msg in messages_desc[final_len - 1::-1]]
 
         logger.info(
             "成功获取会话 '%s' 的 %d 条历史消息 (原始上限: %d, 智能扩展后)。",
             session_id,
-            len(messages_in_correct_order),
-            settings.llm.max_history_messages,
+            len(history_dicts),
+            max_history_messages,
         )
 
-        history_dicts = []
-        for msg in messages_in_correct_order:
-            try:
-                message_dict = json.loads(msg.content)
-                history_dicts.append(message_dict)
-            except json.JSONDecodeError:
-                logger.warning("解析历史消息 content 失败，消息ID: %s", msg.id)
-                history_dicts.append({"role": msg.role, "content": msg.content})
-
         return history_dicts
 
     async def update_history(
@@ -169,31 +266,32 @@ class SessionService:
             "正在为会话 '%s' 向数据库写入 %d 条新消息...", session_id, len(new_messages)
         )
 
-        db_messages = []
-        for msg in new_messages:
-            content_str = json.dumps(msg, ensure_ascii=False)
-            role = msg.get("role", "unknown")
-            db_messages.append(
-                ChatMessage(session_id=session_id, role=role, content=content_str)
-            )
-
-        db.add_all(db_messages)
+        dumps = orjson.dumps
+        rows = [
+            {
+                "session_id": session_id,
+                "role": msg.get("role", "unknown"),
+                # content 是 Text 列，orjson 输出 UTF-8 字节，直接解码即可，中文不做转义
+                "content": dumps(msg, option=_CONTENT_DUMPS_OPTIONS).decode(),
+                "has_tool_calls": "tool_calls" in msg,
+            }
+            for msg in new_messages
+        ]
+
+        # Core executemany 插入，不构造 ORM 对象，也不经过 flush
+        await db.execute(insert(ChatMessage), rows)
         await db.commit()
         logger.info(
-            "成功为会话 '%s' 写入了 %d 条新消息。", session_id, len(db_messages)
+            "成功为会话 '%s' 写入了 %d 条新消息。", session_id, len(rows)
         )
 
     async def clear_session(self, session_id: str, db: AsyncSession) -> bool:
         """清除指定会话的所有历史记录"""
         try:
-            # 删除所有消息
-            delete_messages_query = select(ChatMessage).where(ChatMessage.session_id == session_id)
-            result = await db.execute(delete_messages_query)
-            messages_to_delete = result.scalars().all()
-            
-            for message in messages_to_delete:
-                await db.delete(message)
-            
+            # 用一条 DELETE 语句删除所有消息
+            await db.execute(
+                delete(ChatMessage).where(ChatMessage.session_id == session_id)
+            )
             await db.commit()
             logger.info("已清除会话 '%s' 的所有历史记录", session_id)
             return True
@@ -207,16 +305,24 @@ class SessionService:
         try:
             query = select(ChatSession.session_id).order_by(desc(ChatSession.created_at)).limit(limit)
             result = await db.execute(query)
-            sessions = result.scalars().all()
-            return [session_id for session_id in sessions]
+            return list(result.scalars())
         except Exception as e:
             logger.error("获取会话列表失败: %s", str(e))
             return []
 
 
-# 创建全局单例
-session_service = SessionService()
+@lru_cache(maxsize=1)
+def get_session_service() -> SessionService:
+    """获取全局会话服务实例（首次调用时创建）"""
+    return SessionService()
+
+
+def __getattr__(name: str) -> Any:
+    """延迟创建全局单例，兼容 `from ...session_service import session_service` 的用法"""
+    if name == "session_service":
+        return get_session_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# 导出服务实例
-__all__ = ["session_service", "SessionService"]
\ No newline at end of file
+# 导出服务访问函数
+__all__ = ["get_session_service", "SessionService"]
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Genesis AI 应用共享 HTTP 客户端
+==============================
+
+进程内所有 LLM 提供商共用一个 httpx.AsyncClient，复用其 TCP/TLS 连接池，
+避免每个提供商实例各自建立连接。
+
+共享客户端不携带 base_url 和认证头，由各提供商在每次请求时传入完整 URL
+和自己的请求头，因此同一个客户端可以服务多个提供商/租户。
+
+并发上限：同一时刻最多 MAX_CONNECTIONS 个请求在途（QwenLLMService 的 AsyncOpenAI
+客户端也使用这个连接池），超出的请求在连接池中排队等待空闲连接。启用 HTTP/2 时
+同一连接上的多个请求可以复用，并行的 LLM 调用不会因连接数而串行化。
+"""
+
+from functools import lru_cache
+
+import httpx
+
+try:
+    import h2  # noqa: F401  # httpx 的 HTTP/2 支持依赖 h2
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# 连接池上限：最大并发连接数 / 保持空闲复用的连接数
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+
+@lru_cache(maxsize=1)
+def get_shared_client() -> httpx.AsyncClient:
+    """获取进程级共享的 HTTP 客户端（首次调用时创建）"""
+    return httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=30.0,
+    )
+
+
+async def close_shared_client():
+    """关闭共享 HTTP 客户端，下次获取时重新创建"""
+    if get_shared_client.cache_info().currsize:
+        client = get_shared_client()
+        get_shared_client.cache_clear()
+        await client.aclose()
+
+
+__all__ = ["get_shared_client", "close_shared_client"]
@@ -7,12 +7,13 @@ Genesis AI 应用 Qwen 提供商
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
-from pydantic import BaseModel, Field
 
 from src.genesis.core.settings import LLMProviderConfig
+from ..http_client import get_shared_client
 from ..interface import (
     LLMProviderInterface,
     LLMProviderException,
@@ -21,30 +22,8 @@ from ..interface import (
     LLMProviderServiceUnavailableError,
 )
 
-
-class QwenChatMessage(BaseModel):
-    """Qwen 聊天消息模型"""
-    role: str = Field(..., description="消息角色")
-    content: str = Field(..., description="消息内容")
-
-
-class QwenChatCompletionRequest(BaseModel):
-    """Qwen 聊天补全请求模型"""
-    model: str = Field(..., description="模型名称")
-    messages: List[QwenChatMessage] = Field(..., description="消息列表")
-    temperature: Optional[float] = Field(None, description="温度参数")
-    max_tokens: Optional[int] = Field(None, description="最大令牌数")
-    stream: Optional[bool] = Field(False, description="是否流式输出")
-
-
-class QwenChatCompletionResponse(BaseModel):
-    """Qwen 聊天补全响应模型"""
-    id: str = Field(..., description="响应ID")
-    object: str = Field(..., description="对象类型")
-    created: int = Field(..., description="创建时间")
-    model: str = Field(..., description="使用的模型")
-    choices: List[Dict[str, Any]] = Field(..., description="选择列表")
-    usage: Optional[Dict[str, int]] = Field(None, description="使用统计")
+# 模型列表缓存有效期（秒），模型列表很少变化
+MODELS_CACHE_TTL = 600.0
 
 
 class QwenProvider(LLMProviderInterface):
@@ -60,7 +39,7 @@ class QwenProvider(LLMProviderInterface):
         
         Args:
             config: Qwen 配置
-            http_client: HTTP客户端，如果为None则创建新的
+            http_client: HTTP客户端，如果为None则使用进程级共享客户端
         """
         self.config = config
         self.base_url = config.base_url.rstrip('/')
@@ -68,16 +47,26 @@ class QwenProvider(LLMProviderInterface):
         self.max_tokens = config.max_tokens
         self.temperature = config.temperature
         
-        # 创建HTTP客户端
-        self._http_client = http_client or httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=30.0,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self._get_api_key()}",
-            },
-        )
+        # 认证信息随每次请求发送，不写入客户端默认头，共享客户端可服务多个提供商
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self._get_api_key()}",
+        }
+        # 外部注入的客户端随提供商一起关闭；未注入时每次请求取当前的共享客户端，
+        # 不保存其引用，close_shared_client 关闭后下次请求会使用重新创建的客户端
+        self._http_client = http_client
+        # (获取时间, 模型列表, 按 id 索引的模型)
+        self._models_cache: Optional[
+            Tuple[float, List[Dict[str, Any]], Dict[str, Dict[str, Any]]]
+        ] = None
     
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        """本次请求使用的HTTP客户端：外部注入的客户端，或当前的进程级共享客户端"""
+        if self._http_client is not None:
+            return self._http_client
+        return get_shared_client()
+
     def _get_api_key(self) -> str:
         """获取API密钥"""
         # 从环境变量获取Qwen API密钥
@@ -119,9 +108,10 @@ class QwenProvider(LLMProviderInterface):
             }
             
             # 发送请求
-            response = await self._http_client.post(
-                "/chat/completions",
+            response = await self._client.post(
+                f"{self.base_url}/chat/completions",
                 json=request_data,
+                headers=self._headers,
             )
             
             # 检查响应状态
@@ -192,13 +182,33 @@ class QwenProvider(LLMProviderInterface):
     
     async def get_models(self) -> List[Dict[str, Any]]:
         """
-        获取可用的模型列表
+        获取可用的模型列表（结果缓存 MODELS_CACHE_TTL 秒）
         
         Returns:
             模型信息列表
         """
+        models, _ = await self._get_models_cached()
+        return list(models)
+
+    async def _get_models_cached(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """返回 (模型列表, 按 id 索引的模型)，缓存过期时重新请求"""
+        cached = self._models_cache
+        if cached is not None and time.monotonic() - cached[0] < MODELS_CACHE_TTL:
+            return cached[1], cached[2]
+
+        result = await self._fetch_models()
+        models_by_id = {m["id"]: m for m in result}
+        self._models_cache = (time.monotonic(), result, models_by_id)
+        return result, models_by_id
+
+    async def _fetch_models(self) -> List[Dict[str, Any]]:
+        """从 API 获取模型列表"""
         try:
-            response = await self._http_client.get("/models")
+            response = await self._client.get(
+                f"{self.base_url}/models", headers=self._headers
+            )
             
             if response.status_code != 200:
                 raise LLMProviderException(f"获取模型列表失败: {response.status_code}")
@@ -233,15 +243,11 @@ class QwenProvider(LLMProviderInterface):
         Returns:
             模型详细信息
         """
-        # 获取所有模型
-        models = await self.get_models()
-        
-        # 查找指定模型
-        for model_info in models:
-            if model_info["id"] == model:
-                return model_info
-        
-        raise LLMProviderException(f"模型不存在: {model}")
+        _, models_by_id = await self._get_models_cached()
+        model_info = models_by_id.get(model)
+        if model_info is None:
+            raise LLMProviderException(f"模型不存在: {model}")
+        return model_info
     
     async def health_check(self) -> bool:
         """
@@ -251,9 +257,11 @@ class QwenProvider(LLMProviderInterface):
             如果服务正常返回True，否则返回False
         """
         try:
-            # 尝试获取模型列表作为健康检查
-            await self.get_models()
-            return True
+            # 只看状态码，不读取和解析模型列表的响应体
+            async with self._client.stream(
+                "GET", f"{self.base_url}/models", headers=self._headers, timeout=2.0
+            ) as response:
+                return response.status_code == 200
         except Exception:
             return False
     
@@ -276,8 +284,8 @@ class QwenProvider(LLMProviderInterface):
         return self.model
     
     async def close(self):
-        """关闭HTTP客户端"""
-        if self._http_client:
+        """关闭外部注入的HTTP客户端；使用共享客户端时不做任何操作"""
+        if self._http_client is not None:
             await self._http_client.aclose()
     
     async def __aenter__(self):
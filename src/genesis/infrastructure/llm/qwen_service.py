@@ -9,13 +9,16 @@
 import logging
 import os
 import json
+from functools import lru_cache
+import orjson
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
 from typing import List, Dict, Any, Optional
 from src.genesis.core.settings import settings
+from src.genesis.infrastructure.llm.http_client import get_shared_client
 
 logger = logging.getLogger(__name__)
 
-
 class QwenLLMService:
     def __init__(self):
         """
@@ -28,67 +31,46 @@ class QwenLLMService:
         api_base = settings.openai_api_base or settings.llm.api_base or settings.llm.external_api_llm_base_url
         model_name = settings.model_name or settings.llm.model_name or "qwen-max"
 
+        # 配置只在初始化时校验一次，之后各调用直接使用 self.client
         if not api_key or not api_base:
-            logger.error(
-                "关键配置 LLM_API_KEY 或 LLM_API_BASE 未设置！服务可能无法正常工作。"
-            )
+            logger.error("LLM服务配置缺失: API_KEY或API_BASE未设置")
+            raise ValueError("LLM服务配置缺失")
 
+        self.default_model = settings.llm.model_name or "qwen-max"
+        # 与其他 LLM 调用共用同一个连接池（HTTP/2 + keep-alive），并行调用不会各自建连
         self.client = AsyncOpenAI(
-            api_key=api_key, base_url=api_base
+            api_key=api_key, base_url=api_base, http_client=get_shared_client()
         )
         logger.info(
             "千问大模型服务客户端已成功创建，目标地址: %s", api_base
         )
 
-    def _get_client(self):
-        """
-        获取或重新创建配置正确的OpenAI客户端
-        """
-        # 检查配置是否有效 - 支持多个配置字段
-        api_key = settings.openai_api_key or settings.llm.api_key or settings.llm.qwen_api_key
-        api_base = settings.openai_api_base or settings.llm.api_base or settings.llm.external_api_llm_base_url
-        
-        if not api_key or not api_base:
-            logger.error("LLM服务配置缺失: API_KEY或API_BASE未设置")
-            raise ValueError("LLM服务配置缺失")
-        
-        # 检查客户端是否存在且配置正确
-        if (not hasattr(self, 'client') or 
-            not self.client or 
-            not self.client.base_url or 
-            not self.client.api_key):
-            
-            logger.warning("重新创建LLM客户端...")
-            
-            # 重新创建客户端
-            self.client = AsyncOpenAI(
-                api_key=api_key, 
-                base_url=api_base
-            )
-            logger.info("LLM客户端已创建，目标地址: %s", api_base)
-        
-        return self.client
-
     async def get_model_decision(
-        self, messages: List[Dict[str, Any]], tool_schemas: List[Dict[str, Any]]
+        self,
+        messages: List[Dict[str, Any]],
+        tool_schemas: List[Dict[str, Any]],
+        tools_json: Optional[bytes] = None,
     ):
         """
         请求大模型，让其根据完整的消息历史决定是直接回答还是调用工具。
+
+        tools_json 为 tool_schemas 已序列化的 JSON（如 tool_registry.get_all_schemas_json()
+        的缓存结果），提供时直接拼接进请求体，不再重复序列化工具列表。
         """
         logger.info("正在向千问大模型请求决策...")
         logger.debug(
             "发送给大模型的决策请求内容: messages数量=%d, tools数量=%d", len(messages), len(tool_schemas)
         )
         
-        # 详细记录工具schemas信息（便于调试）
-        for i, tool_schema in enumerate(tool_schemas):
-            logger.debug("工具 %d: %s", i + 1, json.dumps(tool_schema, ensure_ascii=False))
+        # 详细记录工具schemas信息（便于调试）；序列化开销不小，只在 DEBUG 开启时执行
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, tool_schema in enumerate(tool_schemas):
+                logger.debug("工具 %d: %s", i + 1, json.dumps(tool_schema, ensure_ascii=False))
+
+        client = self.client
 
-        # 获取配置正确的客户端
-        client = self._get_client()
-        
         # 记录详细的API调用参数
-        model_name = settings.llm.model_name or "qwen-max"
+        model_name = self.default_model
         logger.debug("LLM API调用参数 - 模型: %s, 消息数量: %d, 工具数量: %d", 
                     model_name, len(messages), len(tool_schemas))
         logger.debug("LLM Client配置 - API Key存在: %s, 基础URL: %s", 
@@ -102,14 +84,21 @@ class QwenLLMService:
                         len(last_message.get("content", "")))
 
         try:
-            response = await client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                tools=tool_schemas,
-                tool_choice="auto",
+            # 请求体由 orjson 编码为字节串，SDK 原样发送（仍由 SDK 负责重试、超时和响应解析）；
+            # 工具列表在多次调用之间通常不变，直接拼接缓存的 JSON，只序列化本次的消息
+            if tools_json is None:
+                tools_json = orjson.dumps(tool_schemas)
+            body = b"".join((
+                b'{"model":', orjson.dumps(model_name),
+                b',"messages":', orjson.dumps(messages),
+                b',"tools":', tools_json,
+                b',"tool_choice":"auto"}',
+            ))
+            response = await client.post(
+                "/chat/completions", body=body, cast_to=ChatCompletion
             )
             model_message = response.choices[0].message
-            usage = response.usage.model_dump() if hasattr(response, 'usage') else {}
+            usage = response.usage.model_dump() if response.usage else {}
             
             logger.info("成功从千问大模型获取决策响应。")
             logger.debug("大模型决策响应 - 有工具调用: %s, 内容长度: %d", 
@@ -135,10 +124,9 @@ class QwenLLMService:
         logger.info("正在向千问大模型请求对工具结果进行总结...")
         logger.debug("发送给大模型的总结请求消息数量: %d", len(messages_for_summary))
 
-        # 获取配置正确的客户端
-        client = self._get_client()
-        
-        model_name = settings.llm.model_name or "qwen-max"
+        client = self.client
+
+        model_name = self.default_model
         logger.debug("总结API调用参数 - 模型: %s, 消息数量: %d", model_name, len(messages_for_summary))
         logger.debug("LLM Client配置 - API Key存在: %s, 基础URL: %s", 
                     bool(client.api_key), client.base_url)
@@ -168,13 +156,13 @@ class QwenLLMService:
         logger.info("正在执行直接千问大模型聊天补全调用...")
         
         # 记录调用参数（排除敏感信息）
-        safe_kwargs = {k: v for k, v in kwargs.items() if k not in ['api_key', 'headers']}
-        logger.debug("聊天补全调用参数: %s", safe_kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            safe_kwargs = {k: v for k, v in kwargs.items() if k not in ['api_key', 'headers']}
+            logger.debug("聊天补全调用参数: %s", safe_kwargs)
         
-        # 获取配置正确的客户端
-        client = self._get_client()
-        
-        model_name = kwargs.get('model', settings.llm.model_name or "qwen-max")
+        client = self.client
+
+        model_name = kwargs.get('model', self.default_model)
         messages = kwargs.get('messages', [])
         
         logger.debug("聊天补全API调用参数 - 模型: %s, 消息数量: %d", model_name, len(messages))
@@ -196,5 +184,17 @@ class QwenLLMService:
             raise
 
 
-# 创建一个全局单例
-qwen_llm_service = QwenLLMService()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_qwen_service() -> QwenLLMService:
+    """获取全局千问服务实例（首次调用时创建客户端）"""
+    return QwenLLMService()
+
+
+def __getattr__(name: str) -> Any:
+    """延迟创建全局单例，兼容 `from ...qwen_service import qwen_llm_service` 的用法"""
+    if name == "qwen_llm_service":
+        return get_qwen_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["get_qwen_service", "QwenLLMService"]
\ No newline at end of file